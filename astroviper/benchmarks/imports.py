@@ -0,0 +1,47 @@
+import subprocess
+import sys
+
+
+def _count_imported_modules(module):
+    """Return the number of modules ``import module`` adds in a fresh interpreter."""
+    code = (
+        "import sys; n = len(sys.modules); "
+        f"import {module}; print(len(sys.modules) - n)"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return int(out.stdout.strip())
+
+
+class TestImportTime:
+    """
+    Benchmarks for the cold import cost of astroviper modules and the first
+    call of their entry points.
+
+    timeraw_ benchmarks run their code in a fresh interpreter for every sample
+    (see https://asv.readthedocs.io/en/stable/writing_benchmarks.html#raw-timing-benchmarks),
+    so import costs paid by short-lived pipeline workers are trended per commit.
+    """
+
+    version = "astroviper 0.0.30"
+
+    def timeraw_import_fft(self):
+        """Benchmark a cold import of astroviper.core.imaging.fft."""
+        return "import astroviper.core.imaging.fft"
+
+    def track_import_fft_module_count(self):
+        """Number of modules loaded by a cold import of astroviper.core.imaging.fft."""
+        return _count_imported_modules("astroviper.core.imaging.fft")
+
+    track_import_fft_module_count.unit = "modules"
+
+    def timeraw_first_fft_lm_to_uv(self):
+        """Benchmark the first fft_lm_to_uv call after a cold import."""
+        return (
+            "fft_lm_to_uv(sky, (0, 1))",
+            "import numpy as np\n"
+            "from astroviper.core.imaging.fft import fft_lm_to_uv\n"
+            "sky = np.zeros((256, 256))\n"
+            "sky[128, 128] = 1",
+        )
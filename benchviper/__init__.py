@@ -0,0 +1,5 @@
+"""Tools for running and analysing the asv benchmarks of the VIPER projects.
+
+Each module is a command line tool run from the repository root, e.g.
+``python -m benchviper.profiling --help``.
+"""
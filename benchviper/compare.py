@@ -0,0 +1,208 @@
+"""Statistical comparison of two asv benchmark runs.
+
+Compares the per-sample timings of two commits (or two result files) for
+every benchmark and parameter combination they have in common:
+
+- the ratio of medians (B / A) with a bootstrap confidence interval,
+- a two-sided Mann-Whitney U test,
+- Benjamini-Hochberg correction of the p-values over all comparisons.
+
+A change is reported as significant when its corrected p-value (q) is below
+``--alpha``, its confidence interval excludes 1 and it exceeds
+``--threshold``. Per-sample data is only stored by asv when running with
+``asv run --record-samples``; comparisons without samples are skipped.
+
+Example::
+
+    python -m benchviper.compare xradio <commit A> <commit B> --format markdown
+"""
+
+import argparse
+import json
+import math
+import random
+import statistics
+
+from .results import (
+    benchmark_key,
+    find_result_file,
+    iter_benchmark_results,
+    load_result_file,
+)
+
+
+def mann_whitney_u(a, b):
+    """Two-sided Mann-Whitney U test, returning (U, p-value).
+
+    Uses the normal approximation with tie and continuity correction, which
+    is adequate for the 10 or more samples asv records per benchmark.
+    """
+    n_a, n_b = len(a), len(b)
+    ranked = sorted([(x, 0) for x in a] + [(x, 1) for x in b])
+    ranks = [0.0] * len(ranked)
+    tie_term = 0.0
+    i = 0
+    while i < len(ranked):
+        j = i
+        while j + 1 < len(ranked) and ranked[j + 1][0] == ranked[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        ties = j - i + 1
+        tie_term += ties**3 - ties
+        i = j + 1
+    rank_sum_a = sum(r for r, (_, group) in zip(ranks, ranked) if group == 0)
+    u = rank_sum_a - n_a * (n_a + 1) / 2
+    n = n_a + n_b
+    variance = n_a * n_b / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return u, 1.0
+    z = (abs(u - n_a * n_b / 2) - 0.5) / math.sqrt(variance)
+    return u, min(1.0, math.erfc(max(z, 0.0) / math.sqrt(2)))
+
+
+def bootstrap_ratio_ci(a, b, confidence=0.95, n_resamples=2000, rng=None):
+    """Bootstrap confidence interval of median(b) / median(a)."""
+    rng = rng or random.Random(0)
+    ratios = sorted(
+        statistics.median(rng.choices(b, k=len(b)))
+        / statistics.median(rng.choices(a, k=len(a)))
+        for _ in range(n_resamples)
+    )
+    tail = (1 - confidence) / 2
+    low = ratios[int(tail * (n_resamples - 1))]
+    high = ratios[int(math.ceil((1 - tail) * (n_resamples - 1)))]
+    return low, high
+
+
+def benjamini_hochberg(p_values):
+    """Return the Benjamini-Hochberg adjusted p-values (q-values), in input order."""
+    n = len(p_values)
+    order = sorted(range(n), key=lambda i: p_values[i])
+    q_values = [0.0] * n
+    running_min = 1.0
+    for rank in range(n, 0, -1):
+        i = order[rank - 1]
+        running_min = min(running_min, p_values[i] * n / rank)
+        q_values[i] = running_min
+    return q_values
+
+
+def _samples_by_key(data):
+    return {
+        benchmark_key(entry): entry
+        for entry in iter_benchmark_results(data)
+        if entry.get("samples")
+    }
+
+
+def compare(data_a, data_b, confidence=0.95, n_resamples=2000):
+    """Compare two loaded result files and return one row per common benchmark.
+
+    Benchmarks whose version differs between the two runs are not
+    comparable and are skipped, as are those without at least two samples
+    in each run.
+    """
+    a, b = _samples_by_key(data_a), _samples_by_key(data_b)
+    rng = random.Random(0)
+    rows = []
+    for key in sorted(set(a) & set(b)):
+        entry_a, entry_b = a[key], b[key]
+        samples_a, samples_b = entry_a["samples"], entry_b["samples"]
+        if entry_a["version"] != entry_b["version"]:
+            continue
+        if len(samples_a) < 2 or len(samples_b) < 2:
+            continue
+        median_a, median_b = statistics.median(samples_a), statistics.median(samples_b)
+        _, p_value = mann_whitney_u(samples_a, samples_b)
+        ci_low, ci_high = bootstrap_ratio_ci(
+            samples_a, samples_b, confidence, n_resamples, rng
+        )
+        rows.append(
+            {
+                "benchmark": key,
+                "median_a": median_a,
+                "median_b": median_b,
+                "ratio": median_b / median_a,
+                "ci_low": ci_low,
+                "ci_high": ci_high,
+                "p_value": p_value,
+            }
+        )
+    for row, q_value in zip(rows, benjamini_hochberg([r["p_value"] for r in rows])):
+        row["q_value"] = q_value
+    return rows
+
+
+def classify(row, alpha=0.05, threshold=0.0):
+    """Return "slower", "faster" or None (no significant change) for a row."""
+    if row["q_value"] >= alpha:
+        return None
+    if row["ci_low"] > 1 + threshold:
+        return "slower"
+    if row["ci_high"] < 1 - threshold:
+        return "faster"
+    return None
+
+
+def format_markdown(rows, commit_a, commit_b):
+    lines = [
+        f"Comparing {commit_a} (A) to {commit_b} (B): "
+        f"{sum(r['verdict'] == 'slower' for r in rows)} slower, "
+        f"{sum(r['verdict'] == 'faster' for r in rows)} faster",
+        "",
+        "| benchmark | A (s) | B (s) | B / A | CI | q | change |",
+        "|---|---|---|---|---|---|---|",
+    ]
+    for row in rows:
+        lines.append(
+            f"| `{row['benchmark']}` | {row['median_a']:.4g} | {row['median_b']:.4g} "
+            f"| {row['ratio']:.3f} | [{row['ci_low']:.3f}, {row['ci_high']:.3f}] "
+            f"| {row['q_value']:.2g} | {row['verdict'] or ''} |"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchviper.compare", description=__doc__.split("\n")[0]
+    )
+    parser.add_argument("project_dir", help="asv project directory, e.g. xradio")
+    parser.add_argument("commit_a", help="baseline commit hash or result file")
+    parser.add_argument("commit_b", help="contender commit hash or result file")
+    parser.add_argument("--machine", default="gh-runner")
+    parser.add_argument("--env-name", help="environment name, if several were run")
+    parser.add_argument("--alpha", type=float, default=0.05)
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.0,
+        help="minimum relative change to report, e.g. 0.05 for 5%%",
+    )
+    parser.add_argument("--resamples", type=int, default=2000)
+    parser.add_argument("--all", action="store_true", help="also list unchanged benchmarks")
+    parser.add_argument("--format", choices=["markdown", "json"], default="markdown")
+    args = parser.parse_args(argv)
+
+    data_a, data_b = (
+        load_result_file(
+            find_result_file(args.project_dir, args.machine, commit, args.env_name)
+        )
+        for commit in (args.commit_a, args.commit_b)
+    )
+    rows = compare(data_a, data_b, args.confidence, args.resamples)
+    for row in rows:
+        row["verdict"] = classify(row, args.alpha, args.threshold)
+    if not args.all:
+        rows = [row for row in rows if row["verdict"]]
+    rows.sort(key=lambda row: abs(math.log(row["ratio"])), reverse=True)
+
+    if args.format == "json":
+        print(json.dumps(rows, indent=1))
+    else:
+        print(format_markdown(rows, args.commit_a, args.commit_b))
+
+
+if __name__ == "__main__":
+    main()
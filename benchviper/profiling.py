@@ -0,0 +1,319 @@
+"""Per-benchmark profile capture and hot-function diff between commits.
+
+``capture`` runs one benchmark under a profiler and stores a compact table of
+per-function cumulative and self time next to the asv results, in
+``<project>/results/<machine>/profiles/<commit>/<benchmark>.json``.
+asv ignores that directory when loading results, as it has no machine.json.
+
+- with ``--profiler cprofile`` (default) the benchmark is run by
+  ``asv profile`` in the asv environment built for the commit;
+- with ``--profiler pyinstrument`` (sampling, lower overhead on code with many
+  small calls) the benchmark is run in the current Python environment, which
+  must have the project installed at the commit given by ``--commit``.
+
+``diff`` ranks the functions of given packages (xradio and astroviper by
+default) by how much of the time change between two captured commits they
+account for.
+
+Examples::
+
+    python -m benchviper.profiling capture xradio \\
+        convert_msv2_to_processing_set.TestConvertMsv2ToProcessingSet.time_full_workflow \\
+        --commit 0f9957e5
+    python -m benchviper.profiling diff xradio \\
+        convert_msv2_to_processing_set.TestConvertMsv2ToProcessingSet.time_full_workflow \\
+        0f9957e5 10ab615b
+"""
+
+import argparse
+import ast
+import contextlib
+import importlib
+import json
+import os
+import pstats
+import re
+import subprocess
+import sys
+import tempfile
+
+DEFAULT_PACKAGES = ["xradio", "astroviper"]
+
+
+def _normalize_path(path):
+    """Strip the environment specific prefix of a source path.
+
+    Keeps the path relative to site-packages (or the standard library), so
+    that functions have the same key in profiles taken in different asv
+    environments.
+    """
+    path = path.replace(os.sep, "/")
+    for marker in ("/site-packages/", "/dist-packages/"):
+        if marker in path:
+            return path.rsplit(marker, 1)[1]
+    match = re.search(r"/lib/python\d+\.\d+/(.*)$", path)
+    if match:
+        return match.group(1)
+    return path
+
+
+def _function_key(path, line, name):
+    return f"{_normalize_path(path)}:{line}({name})"
+
+
+def _compact(functions, total_time, min_fraction):
+    """Keep the functions whose cumulative time is at least min_fraction of the total."""
+    threshold = total_time * min_fraction
+    kept = [f for f in functions if f["cumtime"] >= threshold]
+    return sorted(kept, key=lambda f: f["cumtime"], reverse=True)
+
+
+def cprofile_table(prof_path, min_fraction=0.001):
+    """Return the per-function table of a cProfile/pstats file."""
+    stats = pstats.Stats(prof_path)
+    functions = [
+        {
+            "function": _function_key(path, line, name),
+            "ncalls": ncalls,
+            "tottime": tottime,
+            "cumtime": cumtime,
+        }
+        for (path, line, name), (_, ncalls, tottime, cumtime, _) in stats.stats.items()
+    ]
+    return stats.total_tt, _compact(functions, stats.total_tt, min_fraction)
+
+
+def pyinstrument_table(session, min_fraction=0.001):
+    """Return the per-function table of a pyinstrument session.
+
+    A sampling profiler does not count calls, so ``ncalls`` is None. The
+    cumulative time of a function only counts its outermost frame in each
+    stack, so that recursion is not counted twice.
+    """
+    root = session.root_frame()
+    cumtime, tottime = {}, {}
+    stack = [(root, frozenset())]
+    while stack:
+        frame, ancestors = stack.pop()
+        key = _function_key(frame.file_path or "", frame.line_no or 0, frame.function)
+        if key not in ancestors:
+            cumtime[key] = cumtime.get(key, 0.0) + frame.time
+        self_time = frame.time - sum(child.time for child in frame.children)
+        tottime[key] = tottime.get(key, 0.0) + self_time
+        stack.extend((child, ancestors | {key}) for child in frame.children)
+    functions = [
+        {"function": key, "ncalls": None, "tottime": tottime[key], "cumtime": cumtime[key]}
+        for key in cumtime
+    ]
+    return root.time, _compact(functions, root.time, min_fraction)
+
+
+def _parse_benchmark_name(benchmark):
+    """Split ``module.Class.method(param, ...)`` into its name and parameter values."""
+    match = re.fullmatch(r"([\w.]+)(?:\((.*)\))?", benchmark)
+    if not match:
+        raise ValueError(f"Invalid benchmark name: {benchmark}")
+    name, params = match.groups()
+    return name, list(ast.literal_eval(f"[{params}]")) if params else []
+
+
+@contextlib.contextmanager
+def _chdir(path):
+    cwd = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(cwd)
+
+
+def _run_with_pyinstrument(project_dir, benchmark):
+    """Run a benchmark once in this interpreter under pyinstrument and return the session.
+
+    Follows the asv call sequence (setup_cache, setup, benchmark, teardown,
+    teardown_cache) in a temporary working directory, but only the benchmark
+    call itself is profiled.
+    """
+    from pyinstrument import Profiler
+
+    name, params = _parse_benchmark_name(benchmark)
+    module_name, *class_name, method_name = name.split(".")
+    sys.path.insert(0, os.path.abspath(project_dir))
+    module = importlib.import_module(f"benchmarks.{module_name}")
+    owner = getattr(module, class_name[0])() if class_name else module
+
+    def call(attr, *args):
+        func = getattr(owner, attr, None)
+        return func(*args) if func is not None else None
+
+    profiler = Profiler()
+    with tempfile.TemporaryDirectory() as tmp_dir, _chdir(tmp_dir):
+        cache = call("setup_cache")
+        args = ([cache] if cache is not None else []) + params
+        call("setup", *args)
+        try:
+            profiler.start()
+            getattr(owner, method_name)(*args)
+            profiler.stop()
+        finally:
+            call("teardown", *args)
+            if cache is not None:
+                call("teardown_cache", cache)
+    return profiler.last_session
+
+
+def _run_with_asv_profile(project_dir, benchmark, commit, min_fraction):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        prof_path = os.path.join(tmp_dir, "benchmark.prof")
+        subprocess.run(
+            ["asv", "profile", "--output", prof_path, benchmark, commit],
+            cwd=project_dir,
+            check=True,
+        )
+        return cprofile_table(prof_path, min_fraction)
+
+
+def profile_path(project_dir, machine, commit, benchmark):
+    return os.path.join(
+        project_dir, "results", machine, "profiles", commit[:8], f"{benchmark}.json"
+    )
+
+
+def capture(project_dir, benchmark, commit, machine, profiler, min_fraction):
+    """Profile a benchmark and write its per-function table, returning the file path."""
+    if profiler == "pyinstrument":
+        session = _run_with_pyinstrument(project_dir, benchmark)
+        total_time, functions = pyinstrument_table(session, min_fraction)
+    else:
+        total_time, functions = _run_with_asv_profile(
+            project_dir, benchmark, commit, min_fraction
+        )
+
+    path = profile_path(project_dir, machine, commit, benchmark)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(
+            {
+                "benchmark": benchmark,
+                "commit": commit,
+                "profiler": profiler,
+                "total_time": total_time,
+                "functions": functions,
+            },
+            f,
+            indent=1,
+        )
+    return path
+
+
+def _load_table(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def diff(table_a, table_b, packages=DEFAULT_PACKAGES, sort="cumtime"):
+    """Rank the functions of ``packages`` by their time change from table_a to table_b.
+
+    Returns a list of dicts with the function key, its time in both tables and
+    the delta, sorted by the absolute delta of ``sort`` (cumtime or tottime).
+    Functions absent from one table (or below its compaction threshold)
+    count as zero there.
+    """
+    prefixes = tuple(f"{package}/" for package in packages)
+    a = {f["function"]: f for f in table_a["functions"]}
+    b = {f["function"]: f for f in table_b["functions"]}
+    rows = []
+    for key in set(a) | set(b):
+        if not key.startswith(prefixes):
+            continue
+        time_a = a[key][sort] if key in a else 0.0
+        time_b = b[key][sort] if key in b else 0.0
+        rows.append({"function": key, "a": time_a, "b": time_b, "delta": time_b - time_a})
+    return sorted(rows, key=lambda row: abs(row["delta"]), reverse=True)
+
+
+def format_diff(table_a, table_b, rows, sort, top):
+    total_delta = table_b["total_time"] - table_a["total_time"]
+    lines = [
+        f"{table_a['benchmark']}: {table_a['total_time']:.4g} s ({table_a['commit']}) -> "
+        f"{table_b['total_time']:.4g} s ({table_b['commit']}), delta {total_delta:+.4g} s",
+        "",
+        f"| function | {sort} A (s) | {sort} B (s) | delta (s) | share of delta |",
+        "|---|---|---|---|---|",
+    ]
+    for row in rows[:top]:
+        share = row["delta"] / total_delta if total_delta else float("nan")
+        lines.append(
+            f"| `{row['function']}` | {row['a']:.4g} | {row['b']:.4g} "
+            f"| {row['delta']:+.4g} | {share:.0%} |"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchviper.profiling", description=__doc__.split("\n")[0]
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    capture_parser = subparsers.add_parser(
+        "capture", help="profile a benchmark and store its per-function table"
+    )
+    capture_parser.add_argument("project_dir", help="asv project directory, e.g. xradio")
+    capture_parser.add_argument(
+        "benchmark", help="full benchmark name, with parameters if parametrized"
+    )
+    capture_parser.add_argument("--commit", required=True, help="commit to profile")
+    capture_parser.add_argument("--machine", default="gh-runner")
+    capture_parser.add_argument(
+        "--profiler", choices=["cprofile", "pyinstrument"], default="cprofile"
+    )
+    capture_parser.add_argument(
+        "--min-fraction",
+        type=float,
+        default=0.001,
+        help="drop functions below this fraction of the total time",
+    )
+
+    diff_parser = subparsers.add_parser(
+        "diff", help="rank functions by their contribution to a time change"
+    )
+    diff_parser.add_argument("project_dir")
+    diff_parser.add_argument("benchmark")
+    diff_parser.add_argument("commit_a")
+    diff_parser.add_argument("commit_b")
+    diff_parser.add_argument("--machine", default="gh-runner")
+    diff_parser.add_argument(
+        "--package",
+        action="append",
+        dest="packages",
+        help="package whose functions are ranked (repeatable), default xradio and astroviper",
+    )
+    diff_parser.add_argument("--sort", choices=["cumtime", "tottime"], default="cumtime")
+    diff_parser.add_argument("--top", type=int, default=20)
+
+    args = parser.parse_args(argv)
+    if args.command == "capture":
+        print(
+            capture(
+                args.project_dir,
+                args.benchmark,
+                args.commit,
+                args.machine,
+                args.profiler,
+                args.min_fraction,
+            )
+        )
+    else:
+        table_a = _load_table(
+            profile_path(args.project_dir, args.machine, args.commit_a, args.benchmark)
+        )
+        table_b = _load_table(
+            profile_path(args.project_dir, args.machine, args.commit_b, args.benchmark)
+        )
+        rows = diff(table_a, table_b, args.packages or DEFAULT_PACKAGES, args.sort)
+        print(format_diff(table_a, table_b, rows, args.sort, args.top))
+
+
+if __name__ == "__main__":
+    main()
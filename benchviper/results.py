@@ -0,0 +1,83 @@
+"""Reading of the asv results database.
+
+asv stores one JSON file per commit and environment in
+``<project>/results/<machine>/``, with the values of each benchmark in the
+columns listed in ``result_columns`` (``result``, ``params``, ``version``,
+``stats_*``, ``samples``, ...). Columns at the end may be missing, and
+``samples`` is only stored when running ``asv run --record-samples``.
+"""
+
+import glob
+import itertools
+import json
+import os
+
+_SKIP_FILES = {"machine.json", "benchmarks.json"}
+
+
+def result_files(project_dir, machine):
+    """Return the result files of a machine, in no particular order."""
+    return [
+        path
+        for path in glob.glob(os.path.join(project_dir, "results", machine, "*.json"))
+        if os.path.basename(path) not in _SKIP_FILES
+    ]
+
+
+def find_result_file(project_dir, machine, commit, env_name=None):
+    """Return the result file of a commit, or the path itself if it is a file.
+
+    asv names result files ``<commit hash[:8]>-<environment name>.json``; when
+    the commit was run in several environments, ``env_name`` selects one.
+    """
+    if os.path.isfile(commit):
+        return commit
+    pattern = f"{commit[:8]}-{env_name or '*'}.json"
+    matches = sorted(
+        glob.glob(os.path.join(project_dir, "results", machine, pattern))
+    )
+    if not matches:
+        raise FileNotFoundError(
+            f"No results for {commit} in {os.path.join(project_dir, 'results', machine)}"
+        )
+    if len(matches) > 1:
+        raise ValueError(
+            f"Several environments have results for {commit}, select one of: "
+            + ", ".join(os.path.basename(m) for m in matches)
+        )
+    return matches[0]
+
+
+def load_result_file(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def iter_benchmark_results(data):
+    """Yield one dict per benchmark and parameter combination of a result file.
+
+    Each dict has the benchmark ``name``, its ``version``, the ``params``
+    tuple (parameter reprs as stored by asv, empty if not parametrized), and
+    the ``result``, ``samples`` and ``stats_*`` values for that combination
+    (None when not recorded).
+    """
+    columns = data["result_columns"]
+    for name, values in data["results"].items():
+        row = dict(zip(columns, values))
+        params = row.get("params") or []
+        combinations = list(itertools.product(*params)) if params else [()]
+        for i, combination in enumerate(combinations):
+            entry = {"name": name, "version": row.get("version"), "params": combination}
+            for column, value in row.items():
+                if column in ("params", "version", "started_at", "duration"):
+                    continue
+                # per-combination columns are lists, or None when not run
+                entry[column] = value[i] if isinstance(value, list) else value
+            yield entry
+
+
+def benchmark_key(entry):
+    """Return a printable ``name(param, ...)`` key of a benchmark result entry."""
+    if not entry["params"]:
+        return entry["name"]
+    return f"{entry['name']}({', '.join(entry['params'])})"
@@ -0,0 +1,265 @@
+"""Dependency-aware selection of the benchmarks affected by project commits.
+
+For every commit of a range, the files changed with respect to its first
+parent are mapped to the benchmark modules that (transitively) import them:
+the import graph of the project is built statically from its sources at that
+commit, and the imports of each benchmark module (including the helper
+modules it imports from the benchmarks package) from the working tree. For
+example a change in ``xradio/image/`` selects ``image`` and ``image_xds``.
+
+Changes to packaging files (``pyproject.toml``, ``setup.py``, ...) select
+every benchmark, as they may change dependencies; changes outside the package
+(tests, docs, CI) select none.
+
+Prints one ``<commit> <regex>`` line per commit with affected benchmarks,
+where the regex is meant for ``asv run <commit>^! --bench <regex>``. With
+``--skip-recorded``, commits that already have results for the machine are
+left out, so that a scheduled run only visits the commits merged since the
+previous one.
+
+Example::
+
+    git clone https://github.com/casangi/xradio.git /tmp/xradio
+    python -m benchviper.selection xradio --repo /tmp/xradio --range v1.0.2..main --merges
+"""
+
+import argparse
+import ast
+import os
+import subprocess
+
+PACKAGING_FILES = {
+    "pyproject.toml",
+    "setup.py",
+    "setup.cfg",
+    "requirements.txt",
+    "environment.yml",
+}
+
+
+def _git(repo, *args, **kwargs):
+    return subprocess.run(
+        ["git", "-C", repo, *args], capture_output=True, check=True, **kwargs
+    ).stdout
+
+
+def _module_name(path, source_root):
+    """Return the dotted module name of a .py path relative to the source root."""
+    parts = os.path.relpath(path, source_root or ".").replace(os.sep, "/")[:-3].split("/")
+    if parts[-1] == "__init__":
+        parts = parts[:-1]
+    return ".".join(parts)
+
+
+def _parents(module):
+    parts = module.split(".")
+    return [".".join(parts[:i]) for i in range(1, len(parts))]
+
+
+def parse_imports(source, module, is_package):
+    """Return the absolute names of the modules imported by a module's source.
+
+    ``from a import b`` yields both ``a`` and ``a.b``, since b may be a
+    submodule; names that are not modules are dropped later when resolving
+    against the known modules.
+    """
+    package = module if is_package else module.rpartition(".")[0]
+    imported = set()
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, ast.Import):
+            imported.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                base_parts = package.split(".") if package else []
+                base_parts = base_parts[: len(base_parts) - (node.level - 1)]
+                base = ".".join(base_parts + ([node.module] if node.module else []))
+            else:
+                base = node.module
+            imported.add(base)
+            imported.update(f"{base}.{alias.name}" for alias in node.names)
+    return imported
+
+
+class ImportGraph:
+    """Static import graph of a set of modules.
+
+    Importing a module also runs the ``__init__`` of each of its parent
+    packages, so parents are dependencies too.
+    """
+
+    def __init__(self):
+        self.edges = {}
+
+    def add_module(self, module, source, is_package):
+        self.edges[module] = parse_imports(source, module, is_package) | set(
+            _parents(module)
+        )
+
+    def closure(self, modules):
+        """Return the known modules reachable from ``modules``."""
+        seen, stack = set(), list(modules)
+        while stack:
+            module = stack.pop()
+            if module in seen:
+                continue
+            seen.add(module)
+            stack.extend(self.edges.get(module, ()))
+        return seen
+
+
+def _source_root(paths, package):
+    """Return the directory containing the package (e.g. "src" or "")."""
+    for candidate in (f"src/{package}/__init__.py", f"{package}/__init__.py"):
+        if candidate in paths:
+            return os.path.dirname(os.path.dirname(candidate))
+    raise ValueError(f"Package {package} not found in repository")
+
+
+def project_graph(repo, commit, package):
+    """Return the import graph and source root of the project package at a commit."""
+    paths = _git(repo, "ls-tree", "-r", "--name-only", commit, text=True).split("\n")
+    source_root = _source_root(set(paths), package)
+    prefix = os.path.join(source_root, package, "") if source_root else f"{package}/"
+    py_paths = [p for p in paths if p.startswith(prefix) and p.endswith(".py")]
+    # read all sources in one git call
+    batch = "".join(f"{commit}:{path}\n" for path in py_paths).encode()
+    out = _git(repo, "cat-file", "--batch", input=batch)
+    graph = ImportGraph()
+    offset = 0
+    for path in py_paths:
+        header_end = out.index(b"\n", offset)
+        size = int(out[offset:header_end].split()[2])
+        source = out[header_end + 1 : header_end + 1 + size]
+        offset = header_end + 1 + size + 1
+        graph.add_module(
+            _module_name(path, source_root),
+            source,
+            os.path.basename(path) == "__init__.py",
+        )
+    return graph, source_root
+
+
+def benchmark_imports(benchmark_dir):
+    """Return, per benchmark module, the absolute modules it transitively imports.
+
+    Helper modules of the benchmarks package (``_util``, ...) are followed,
+    so that their imports are attributed to the benchmark modules using them.
+    """
+    graph = ImportGraph()
+    benchmark_modules = []
+    root = os.path.dirname(os.path.abspath(benchmark_dir))
+    for dirpath, _, filenames in os.walk(benchmark_dir):
+        for filename in filenames:
+            if not filename.endswith(".py"):
+                continue
+            path = os.path.join(dirpath, filename)
+            module = _module_name(os.path.abspath(path), root)
+            with open(path) as f:
+                graph.add_module(module, f.read(), filename == "__init__.py")
+            if filename != "__init__.py" and not any(
+                part.startswith("_") for part in module.split(".")
+            ):
+                benchmark_modules.append(module)
+    package = os.path.basename(os.path.abspath(benchmark_dir))
+    # the closure also contains the (external) names imported along the way
+    return {
+        module.split(".", 1)[1]: {
+            name for name in graph.closure([module]) if name.split(".")[0] != package
+        }
+        for module in benchmark_modules
+    }
+
+
+def changed_files(repo, commit):
+    return _git(
+        repo, "diff", "--name-only", f"{commit}^1", commit, text=True
+    ).split()
+
+
+def affected_benchmarks(repo, commit, package, imports_by_benchmark):
+    """Return the sorted benchmark modules affected by a commit."""
+    graph, source_root = project_graph(repo, commit, package)
+    prefix = os.path.join(source_root, package, "") if source_root else f"{package}/"
+    changed = set()
+    for path in changed_files(repo, commit):
+        if os.path.basename(path) in PACKAGING_FILES:
+            return sorted(imports_by_benchmark)
+        if not path.startswith(prefix):
+            continue
+        if path.endswith(".py"):
+            changed.add(_module_name(path, source_root))
+        else:
+            # package data: attribute the change to the package containing it
+            package_init = os.path.join(os.path.dirname(path), "__init__.py")
+            changed.add(_module_name(package_init, source_root))
+    return sorted(
+        benchmark
+        for benchmark, imported in imports_by_benchmark.items()
+        if changed & graph.closure(imported & set(graph.edges))
+    )
+
+
+def bench_regex(benchmarks):
+    return "^(" + "|".join(benchmarks) + r")\."
+
+
+def commits_in_range(repo, commit_range, merges):
+    args = ["rev-list", "--first-parent", "--reverse"]
+    if merges:
+        args.append("--merges")
+    return _git(repo, *args, commit_range, text=True).split()
+
+
+def recorded_commits(results_dir):
+    """Return the commit hash prefixes with a result file in an asv machine results directory."""
+    if not os.path.isdir(results_dir):
+        return set()
+    return {
+        name.split("-", 1)[0]
+        for name in os.listdir(results_dir)
+        if name.endswith(".json") and name != "machine.json"
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchviper.selection", description=__doc__.split("\n")[0]
+    )
+    parser.add_argument("project_dir", help="asv project directory, e.g. xradio")
+    parser.add_argument("--repo", required=True, help="git clone of the project")
+    parser.add_argument("--range", required=True, help="commit range, e.g. v1.0.2..main")
+    parser.add_argument(
+        "--merges", action="store_true", help="only merge commits, as asv run --merges"
+    )
+    parser.add_argument(
+        "--package", help="package name, defaults to the project directory name"
+    )
+    parser.add_argument(
+        "--full", action="store_true", help="select every benchmark (full sweep)"
+    )
+    parser.add_argument(
+        "--skip-recorded",
+        metavar="RESULTS_DIR",
+        help="asv results directory of the machine, e.g. xradio/results/gh-runner;"
+        " commits with results in it are skipped",
+    )
+    args = parser.parse_args(argv)
+
+    package = args.package or os.path.basename(os.path.abspath(args.project_dir))
+    imports_by_benchmark = benchmark_imports(os.path.join(args.project_dir, "benchmarks"))
+    recorded = recorded_commits(args.skip_recorded) if args.skip_recorded else set()
+    for commit in commits_in_range(args.repo, args.range, args.merges):
+        if any(commit.startswith(prefix) for prefix in recorded):
+            continue
+        if args.full:
+            benchmarks = sorted(imports_by_benchmark)
+        else:
+            benchmarks = affected_benchmarks(
+                args.repo, commit, package, imports_by_benchmark
+            )
+        if benchmarks:
+            print(commit, bench_regex(benchmarks))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+"""Noise characterization and tuning of asv repeat/rounds per benchmark class.
+
+``analyze`` estimates the relative noise of every timing benchmark from the
+stored results (the per-sample timings when recorded with
+``--record-samples``, otherwise the interquartile range asv stores in
+``stats_q_25``/``stats_q_75``) and recommends, per benchmark class, the
+``repeat`` and ``rounds`` needed for the 99% confidence interval of the
+result to be within ``--target`` relative half-width, capped by a time
+budget per benchmark. With ``--write`` the recommendations are written as
+class attributes into the benchmark sources.
+
+``calibrate`` first runs the selected benchmarks of one commit with many
+samples under a separate machine name (so the gh-runner results are not
+modified), then analyzes those results.
+
+``number`` is left to asv's own calibration against ``sample_time``, except
+for classes that force ``number = 1`` (write benchmarks), which is kept.
+
+Examples::
+
+    python -m benchviper.tuning analyze xradio --target 0.02
+    python -m benchviper.tuning calibrate xradio 10ab615b --bench TestLoadProcessingSet
+"""
+
+import argparse
+import ast
+import math
+import os
+import statistics
+import subprocess
+from collections import defaultdict
+
+from .results import iter_benchmark_results, load_result_file, result_files
+
+# two-sided 99% normal quantile, asv reports stats_ci_99_a/b
+Z_99 = 2.576
+# asv default per-round maximum of samples
+MAX_REPEAT_PER_ROUND = 10
+# every round re-runs the whole suite, so more samples go into repeat beyond this
+MAX_ROUNDS = 4
+
+
+def _is_timing_benchmark(name):
+    return name.rsplit(".", 1)[-1].startswith(("time_", "timeraw_"))
+
+
+def relative_noise(entry):
+    """Estimate the relative standard deviation of one benchmark result.
+
+    Uses a robust estimate (MAD) from the samples if they were recorded,
+    otherwise the interquartile range stored by asv. Returns None when the
+    result has neither.
+    """
+    result = entry.get("result")
+    if not result:
+        return None
+    samples = entry.get("samples")
+    if samples and len(samples) >= 3:
+        median = statistics.median(samples)
+        mad = statistics.median(abs(s - median) for s in samples)
+        return 1.4826 * mad / median
+    q_25, q_75 = entry.get("stats_q_25"), entry.get("stats_q_75")
+    if q_25 is None or q_75 is None:
+        return None
+    return (q_75 - q_25) / 1.349 / result
+
+
+def collect_noise(paths):
+    """Return per benchmark key the noise estimates, timings and sample counts of all files."""
+    noise = defaultdict(lambda: {"noise": [], "time": [], "samples": [], "number": []})
+    for path in paths:
+        for entry in iter_benchmark_results(load_result_file(path)):
+            if not _is_timing_benchmark(entry["name"]):
+                continue
+            rel_noise = relative_noise(entry)
+            if rel_noise is None:
+                continue
+            stats = noise[(entry["name"], entry["params"])]
+            stats["noise"].append(rel_noise)
+            stats["time"].append(entry["result"])
+            stats["samples"].append(entry.get("stats_repeat") or 0)
+            stats["number"].append(entry.get("stats_number") or 1)
+    return noise
+
+
+def required_samples(rel_noise, target):
+    """Number of samples for the relative 99% CI half-width to be at most target."""
+    return max(2, math.ceil((Z_99 * rel_noise / target) ** 2))
+
+
+def recommend(noise, target, time_budget):
+    """Recommend repeat/rounds per benchmark class.
+
+    The noisiest benchmark (or parameter combination) of a class drives the
+    recommendation, as repeat and rounds are class attributes. Samples are
+    spread over rounds of MAX_REPEAT_PER_ROUND samples (up to MAX_ROUNDS
+    rounds, the rest going into repeat), and the total
+    is capped so that a benchmark does not take more than time_budget seconds.
+    """
+    by_class = defaultdict(list)
+    for (name, params), stats in noise.items():
+        by_class[name.rsplit(".", 1)[0]].append(stats)
+
+    recommendations = {}
+    for class_name, all_stats in sorted(by_class.items()):
+        rel_noise = max(statistics.median(s["noise"]) for s in all_stats)
+        sample_time = max(
+            statistics.median(t * n for t, n in zip(s["time"], s["number"]))
+            for s in all_stats
+        )
+        current_samples = min(statistics.median(s["samples"]) for s in all_stats)
+        n_samples = required_samples(rel_noise, target)
+        budget_samples = max(2, int(time_budget / sample_time)) if sample_time else n_samples
+        limited = n_samples > budget_samples
+        n_samples = min(n_samples, budget_samples)
+        rounds = min(MAX_ROUNDS, max(2, math.ceil(n_samples / MAX_REPEAT_PER_ROUND)))
+        repeat = max(1, math.ceil(n_samples / rounds))
+        recommendations[class_name] = {
+            "relative_noise": rel_noise,
+            "current_samples": current_samples,
+            "current_ci": Z_99 * rel_noise / math.sqrt(current_samples)
+            if current_samples
+            else None,
+            "repeat": repeat,
+            "rounds": rounds,
+            "expected_ci": Z_99 * rel_noise / math.sqrt(repeat * rounds),
+            "budget_limited": limited,
+        }
+    return recommendations
+
+
+def format_recommendations(recommendations):
+    lines = [
+        "| class | rel. noise | samples | 99% CI | repeat | rounds | expected 99% CI |",
+        "|---|---|---|---|---|---|---|",
+    ]
+    for class_name, rec in recommendations.items():
+        current_ci = f"{rec['current_ci']:.1%}" if rec["current_ci"] is not None else ""
+        budget_note = " (time budget)" if rec["budget_limited"] else ""
+        lines.append(
+            f"| `{class_name}` | {rec['relative_noise']:.1%} | {rec['current_samples']:g} "
+            f"| {current_ci} | {rec['repeat']} | {rec['rounds']} "
+            f"| {rec['expected_ci']:.1%}{budget_note} |"
+        )
+    return "\n".join(lines)
+
+
+def write_class_attributes(path, class_name, attributes):
+    """Set class attributes (``name = value`` lines) in a benchmark source file.
+
+    Existing assignments are replaced in place; missing ones are inserted
+    after the class ``version`` attribute (or the class docstring).
+    """
+    with open(path) as f:
+        lines = f.read().splitlines(keepends=True)
+    class_node = next(
+        node
+        for node in ast.parse("".join(lines)).body
+        if isinstance(node, ast.ClassDef) and node.name == class_name
+    )
+    assigned, anchor = {}, None
+    for node in class_node.body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1:
+            target = node.targets[0]
+            if isinstance(target, ast.Name):
+                assigned[target.id] = node
+                if target.id == "version":
+                    anchor = node
+        elif anchor is None and isinstance(node, ast.Expr):
+            anchor = node  # class docstring
+    indent = " " * class_node.body[-1].col_offset
+
+    inserts = []
+    for name, value in attributes.items():
+        line = f"{indent}{name} = {value!r}\n"
+        if name in assigned:
+            node = assigned[name]
+            lines[node.lineno - 1 : node.end_lineno] = [line] + [""] * (
+                node.end_lineno - node.lineno
+            )
+        else:
+            inserts.append(line)
+    if inserts:
+        at = (anchor or class_node.body[0]).end_lineno
+        lines[at:at] = inserts
+    with open(path, "w") as f:
+        f.write("".join(lines))
+
+
+def write_recommendations(project_dir, recommendations):
+    for class_path, rec in recommendations.items():
+        module, class_name = class_path.rsplit(".", 1)
+        path = os.path.join(project_dir, "benchmarks", *module.split(".")) + ".py"
+        write_class_attributes(
+            path, class_name, {"repeat": rec["repeat"], "rounds": rec["rounds"]}
+        )
+
+
+def calibrate(project_dir, commit, bench, machine, repeat, rounds):
+    """Run benchmarks of one commit with many samples under a separate machine name."""
+    subprocess.run(["asv", "machine", "--machine", machine, "--yes"], cwd=project_dir, check=True)
+    subprocess.run(
+        [
+            "asv",
+            "run",
+            f"{commit}^!",
+            "--machine",
+            machine,
+            "--record-samples",
+            "-a",
+            f"repeat={repeat}",
+            "-a",
+            f"rounds={rounds}",
+        ]
+        + (["--bench", bench] if bench else []),
+        cwd=project_dir,
+        check=True,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchviper.tuning", description=__doc__.split("\n")[0]
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    analyze_parser = subparsers.add_parser(
+        "analyze", help="recommend repeat/rounds from the stored results"
+    )
+    calibrate_parser = subparsers.add_parser(
+        "calibrate", help="run a many-samples calibration, then recommend repeat/rounds"
+    )
+    for sub in (analyze_parser, calibrate_parser):
+        sub.add_argument("project_dir", help="asv project directory, e.g. xradio")
+    calibrate_parser.add_argument("commit", help="commit to calibrate on")
+    calibrate_parser.add_argument("--bench", help="regular expression of benchmarks to run")
+    calibrate_parser.add_argument("--repeat", type=int, default=20)
+    calibrate_parser.add_argument("--rounds", type=int, default=2)
+    for sub in (analyze_parser, calibrate_parser):
+        sub.add_argument(
+            "--target",
+            type=float,
+            default=0.02,
+            help="target relative half-width of the 99%% confidence interval",
+        )
+        sub.add_argument(
+            "--time-budget",
+            type=float,
+            default=60.0,
+            help="maximum seconds spent sampling one benchmark",
+        )
+        sub.add_argument(
+            "--write", action="store_true", help="write repeat/rounds into the benchmark classes"
+        )
+    analyze_parser.add_argument("--machine", default="gh-runner")
+    calibrate_parser.add_argument("--machine", default="calibration")
+    args = parser.parse_args(argv)
+
+    if args.command == "calibrate":
+        calibrate(
+            args.project_dir, args.commit, args.bench, args.machine, args.repeat, args.rounds
+        )
+    noise = collect_noise(result_files(args.project_dir, args.machine))
+    recommendations = recommend(noise, args.target, args.time_budget)
+    print(format_recommendations(recommendations))
+    if args.write:
+        write_recommendations(args.project_dir, recommendations)
+
+
+if __name__ == "__main__":
+    main()
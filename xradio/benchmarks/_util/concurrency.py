@@ -0,0 +1,201 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+
+import numpy as np
+import xarray as xr
+import zarr
+
+from xradio.measurement_set import load_processing_set, open_processing_set
+
+from .processing_set import list_partitions
+
+OPENERS = {
+    "open_processing_set": open_processing_set,
+    "load_processing_set": load_processing_set,
+}
+
+# start method of the worker processes: the asv process runs dask threads,
+# whose locks fork could copy in a held state
+_MP_CONTEXT = multiprocessing.get_context(
+    "forkserver"
+    if "forkserver" in multiprocessing.get_all_start_methods()
+    else "spawn"
+)
+
+# processing set opened once in each worker process
+_worker_ps_xdt = None
+
+
+def _open_in_worker(opener, ps_path):
+    global _worker_ps_xdt
+    _worker_ps_xdt = OPENERS[opener](ps_path)
+
+
+def read_partition(ps_xdt, name):
+    """Select every other time step of a partition's visibilities and reduce them."""
+    ps_xdt[name]["VISIBILITY"].isel(time=slice(None, None, 2)).mean().values
+
+
+def _read_partition_in_worker(name):
+    read_partition(_worker_ps_xdt, name)
+
+
+class ConcurrentReaders:
+    """Pool of threads sharing one opened processing set, or of processes each opening it.
+
+    The pool is started and the processing set opened in the constructor, so
+    that :meth:`run` only measures the requests.
+    """
+
+    def __init__(self, executor, n_workers, opener, ps_path):
+        self.n_workers = n_workers
+        if executor == "thread":
+            self.ps_xdt = OPENERS[opener](ps_path)
+            self.pool = ThreadPoolExecutor(n_workers)
+            self._submit = lambda name: self.pool.submit(
+                read_partition, self.ps_xdt, name
+            )
+        else:
+            self.pool = ProcessPoolExecutor(
+                n_workers,
+                mp_context=_MP_CONTEXT,
+                initializer=_open_in_worker,
+                initargs=(opener, ps_path),
+            )
+            self._submit = lambda name: self.pool.submit(
+                _read_partition_in_worker, name
+            )
+        # start every worker before timing
+        self.run(list_partitions(ps_path) * n_workers)
+
+    def run(self, names):
+        """Issue one request per partition name, n_workers at a time.
+
+        A closed loop: every worker is given a new request as soon as its
+        previous one completes, so that requests do not wait in the pool
+        queue and their latency, from dispatch to the result reaching this
+        process, shows the contention between the workers. Returns the wall
+        time of the whole batch and the list of request latencies.
+        """
+        start = time.perf_counter()
+        pending = list(reversed(names))
+        dispatched = {}
+        latencies = []
+        while pending or dispatched:
+            while pending and len(dispatched) < self.n_workers:
+                dispatched[self._submit(pending.pop())] = time.perf_counter()
+            done, _ = wait(dispatched, return_when=FIRST_COMPLETED)
+            end = time.perf_counter()
+            for future in done:
+                future.result()
+                latencies.append(end - dispatched.pop(future))
+        return time.perf_counter() - start, latencies
+
+    def shutdown(self):
+        self.pool.shutdown()
+
+
+# partition or image slab held in memory by each writer process
+_worker_template = None
+
+
+def _deferred_writes(ds):
+    # to_zarr(compute=False) writes numpy-backed variables, and index
+    # coordinates cannot be dask arrays: without their indexes, every
+    # variable is chunked and only its zarr metadata written up front. The
+    # store read back has the same indexes.
+    return ds.drop_indexes(list(ds.xindexes)).chunk()
+
+
+def _load_partition_in_worker(partition_path):
+    global _worker_template
+    _worker_template = xr.open_datatree(partition_path, engine="zarr").load()
+
+
+def write_partition(template, path):
+    """Write a copy of an MSv4 partition (a loaded datatree) to ``path``.
+
+    The zarr metadata of every group and array is written first, then the
+    data of every array, coordinates included. Returns the time spent on
+    each, in seconds.
+    """
+    tree = template.map_over_datasets(_deferred_writes)
+    start = time.perf_counter()
+    delayed = tree.to_zarr(path, mode="w", consolidated=False, compute=False)
+    metadata_time = time.perf_counter() - start
+    delayed.compute(scheduler="synchronous")
+    return metadata_time, time.perf_counter() - start - metadata_time
+
+
+def _write_partition_in_worker(path):
+    return write_partition(_worker_template, path)
+
+
+def _make_slab_in_worker(shape):
+    global _worker_template
+    _worker_template = np.random.default_rng(os.getpid()).random(shape, dtype=np.float32)
+
+
+def _write_slab_in_worker(array_path, index):
+    # slabs are whole chunks along the second axis, so writers never share a chunk
+    zarr.open_array(array_path, mode="r+")[:, index : index + 1] = _worker_template
+
+
+def find_zarr_array(store_path, name):
+    """Return the path of the zarr (v2 or v3 format) array called ``name`` in a local store."""
+    for dirpath, _, filenames in os.walk(store_path):
+        if os.path.basename(dirpath) == name and (
+            ".zarray" in filenames or "zarr.json" in filenames
+        ):
+            return dirpath
+    raise FileNotFoundError(f"no array {name} in {store_path}")
+
+
+# kind -> (worker initializer, write function), see ConcurrentWriters
+WRITERS = {
+    "partition": (_load_partition_in_worker, _write_partition_in_worker),
+    "slab": (_make_slab_in_worker, _write_slab_in_worker),
+}
+
+
+class ConcurrentWriters:
+    """Pool of processes writing MSv4 partitions or image slabs into one store.
+
+    With kind "partition" every worker loads the partition at ``source``
+    once and writes copies of it, see :func:`write_partition`; with kind
+    "slab" every worker makes a random float32 slab of shape ``source`` once
+    and writes it into a zarr array at given indices along its second axis.
+    The pool is started and the writes in ``warmup`` (a list of args, one per
+    worker, that must not write to the same place) made in the constructor,
+    so that :meth:`run` only measures the writes.
+    """
+
+    def __init__(self, kind, n_workers, source, warmup):
+        initializer, self._write = WRITERS[kind]
+        self.pool = ProcessPoolExecutor(
+            n_workers,
+            mp_context=_MP_CONTEXT,
+            initializer=initializer,
+            initargs=(source,),
+        )
+        self.run(warmup)
+
+    def run(self, args_list):
+        """Make one write per args in ``args_list`` concurrently.
+
+        Returns the wall time of the whole batch and the list of results.
+        """
+        start = time.perf_counter()
+        futures = [self.pool.submit(self._write, *args) for args in args_list]
+        results = [future.result() for future in futures]
+        return time.perf_counter() - start, results
+
+    def shutdown(self):
+        self.pool.shutdown()
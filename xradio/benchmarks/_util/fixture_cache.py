@@ -0,0 +1,261 @@
+import contextlib
+import fcntl
+import glob
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from importlib.metadata import PackageNotFoundError, distribution
+
+CACHE_DIR_ENV = "BENCHVIPER_FIXTURE_CACHE"
+BUDGET_ENV = "BENCHVIPER_FIXTURE_CACHE_BUDGET_GB"
+DEFAULT_BUDGET_GB = 20.0
+# entries used more recently than this are never evicted, as another
+# benchmark process may be about to link them (see link_fixture)
+MIN_EVICTION_AGE = 3600
+
+_MANIFEST = ".benchviper_fixture.json"
+# suffix of the directory of an entry holding a lease file per link into it
+_LEASES = ".leases"
+
+
+def cache_dir():
+    """Return the fixture cache directory.
+
+    Defaults to ``~/.cache/benchviper/fixtures``, shared by all asv
+    environments and commits on the machine; set ``BENCHVIPER_FIXTURE_CACHE``
+    to move it (e.g. to a runner cache directory).
+    """
+    return os.environ.get(CACHE_DIR_ENV) or os.path.join(
+        os.path.expanduser("~"), ".cache", "benchviper", "fixtures"
+    )
+
+
+def _xradio_build():
+    """Identify the xradio build being benchmarked.
+
+    The version in the xradio metadata is static between releases, so every
+    development commit would share it. asv exports the commit it benchmarks
+    as ``ASV_COMMIT``; outside asv, the VCS commit or archive hash pip
+    records in ``direct_url.json`` is used, and the version only as a last
+    resort.
+    """
+    commit = os.environ.get("ASV_COMMIT")
+    if commit:
+        return commit
+    try:
+        dist = distribution("xradio")
+    except PackageNotFoundError:
+        return None
+    direct_url = json.loads(dist.read_text("direct_url.json") or "{}")
+    if "vcs_info" in direct_url:
+        return direct_url["vcs_info"]["commit_id"]
+    if "hash" in direct_url.get("archive_info", {}):
+        return direct_url["archive_info"]["hash"]
+    return dist.version
+
+
+def fixture_key(name, params, versioned=True):
+    """Return the content address of a fixture.
+
+    The key covers the fixture name, its generator parameters and, when
+    ``versioned``, the xradio build being benchmarked (see
+    :func:`_xradio_build`), since the output of xradio generators and
+    converters may change with every commit.
+    """
+    key = {
+        "name": name,
+        "params": params,
+        "xradio": _xradio_build() if versioned else None,
+    }
+    return hashlib.sha256(
+        json.dumps(key, sort_keys=True, default=repr).encode()
+    ).hexdigest()
+
+
+@contextlib.contextmanager
+def _locked(path):
+    # asv --parallel may build the same fixture from several processes
+    with open(path, "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+@contextlib.contextmanager
+def _chdir(path):
+    cwd = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(cwd)
+
+
+def _disk_usage(path):
+    return sum(
+        os.path.getsize(os.path.join(dirpath, filename))
+        for dirpath, _, filenames in os.walk(path)
+        for filename in filenames
+    )
+
+
+@contextlib.contextmanager
+def _try_locked(path):
+    # yields whether the lock was acquired, without waiting for it
+    with open(path, "a") as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _remove_stale_builds(entry):
+    # builds of an entry left behind by a killed process (e.g. a setup_cache
+    # timeout), to be called with the lock of the entry held
+    for tmp_dir in glob.glob(glob.escape(entry) + ".tmp-*"):
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def _entry_of(path):
+    # the cache entry holding path (links resolved), None outside the cache
+    root = os.path.realpath(cache_dir())
+    relpath = os.path.relpath(os.path.realpath(path), root)
+    if relpath == os.curdir or relpath.split(os.sep)[0] == os.pardir:
+        return None
+    return os.path.join(root, relpath.split(os.sep)[0])
+
+
+def _leased(entry):
+    # whether a link_fixture link still points into entry, to be called with
+    # the lock of the entry held; leases of removed or replaced links are dropped
+    leased = False
+    for lease in glob.glob(os.path.join(glob.escape(entry + _LEASES), "*")):
+        with open(lease) as f:
+            link_path = f.read()
+        if _entry_of(link_path) == os.path.realpath(entry):
+            leased = True
+        else:
+            os.remove(lease)
+    return leased
+
+
+def _evict(root, keep, budget_bytes):
+    """Remove the least recently used entries until the cache fits the budget.
+
+    Stale builds are removed first; builds in progress count toward the
+    budget. Entries linked into by :func:`link_fixture` are kept.
+    """
+    total = 0
+    for tmp_dir in glob.glob(os.path.join(glob.escape(root), "*.tmp-*")):
+        entry = tmp_dir.rsplit(".tmp-", 1)[0]
+        with _try_locked(entry + ".lock") as locked:
+            if locked:
+                _remove_stale_builds(entry)
+            else:
+                total += _disk_usage(tmp_dir)
+
+    entries = []
+    for name in os.listdir(root):
+        manifest = os.path.join(root, name, _MANIFEST)
+        if os.path.isfile(manifest):
+            with open(manifest) as f:
+                size = json.load(f)["size"]
+            entries.append((os.path.getmtime(manifest), size, os.path.join(root, name)))
+    total += sum(size for _, size, _ in entries)
+    now = time.time()
+    for last_used, size, entry in sorted(entries):
+        if total <= budget_bytes:
+            break
+        if entry == keep or now - last_used < MIN_EVICTION_AGE:
+            continue
+        with _locked(entry + ".lock"):
+            if _leased(entry):
+                continue
+            shutil.rmtree(entry, ignore_errors=True)
+            shutil.rmtree(entry + _LEASES, ignore_errors=True)
+        total -= size
+
+
+def cached_fixture(name, params, build, versioned=True):
+    """Return the cache directory holding a fixture, building it on a cache miss.
+
+    ``build(directory)`` is called with an empty directory (which is also the
+    working directory during the call) and must write the fixture into it.
+    The fixture is then reused by every benchmark class, asv environment and
+    commit asking for the same ``name`` and ``params`` (and xradio build, if
+    ``versioned``), instead of being rebuilt by each ``setup_cache``.
+
+    Fixtures are shared, so benchmarks must only read them. Least recently
+    used entries are evicted when the cache exceeds
+    ``BENCHVIPER_FIXTURE_CACHE_BUDGET_GB`` (20 GB by default), unless they
+    are linked into with :func:`link_fixture`.
+    """
+    root = cache_dir()
+    os.makedirs(root, exist_ok=True)
+    entry = os.path.join(root, f"{name}-{fixture_key(name, params, versioned)[:16]}")
+    with _locked(entry + ".lock"):
+        _remove_stale_builds(entry)
+        if not os.path.isdir(entry):
+            tmp_dir = tempfile.mkdtemp(prefix=os.path.basename(entry) + ".tmp-", dir=root)
+            try:
+                with _chdir(tmp_dir):
+                    build(tmp_dir)
+                with open(os.path.join(tmp_dir, _MANIFEST), "w") as f:
+                    json.dump(
+                        {
+                            "name": name,
+                            "params": params,
+                            "xradio": _xradio_build() if versioned else None,
+                            "size": _disk_usage(tmp_dir),
+                        },
+                        f,
+                        default=repr,
+                    )
+            except BaseException:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                raise
+            os.rename(tmp_dir, entry)
+        # the manifest modification time records the last use for eviction
+        os.utime(os.path.join(entry, _MANIFEST))
+
+    budget_gb = float(os.environ.get(BUDGET_ENV, DEFAULT_BUDGET_GB))
+    _evict(root, entry, budget_gb * 1024**3)
+    return entry
+
+
+def link_fixture(fixture_path, link_path):
+    """Make a cached fixture available at ``link_path`` (relative to the working directory).
+
+    The link leases the cache entry of the fixture: benchmark processes read
+    the fixture through it long after ``setup_cache`` returned, so the entry
+    is not evicted as long as the link exists and points into it.
+    """
+    if os.path.lexists(link_path):
+        if os.path.islink(link_path):
+            os.remove(link_path)
+        else:
+            shutil.rmtree(link_path)
+    entry = _entry_of(fixture_path)
+    if entry is None:
+        os.symlink(fixture_path, link_path)
+        return link_path
+    with _locked(entry + ".lock"):
+        if not os.path.isdir(entry):
+            raise FileNotFoundError(f"fixture {fixture_path} was evicted")
+        os.symlink(fixture_path, link_path)
+        link = os.path.abspath(link_path)
+        os.makedirs(entry + _LEASES, exist_ok=True)
+        lease = hashlib.sha256(link.encode()).hexdigest()[:16]
+        with open(os.path.join(entry + _LEASES, lease), "w") as f:
+            f.write(link)
+    return link_path
@@ -0,0 +1,48 @@
+import dask.array
+import numpy as np
+import xarray as xr
+
+
+def make_scaled_empty_image(factory, image_size, n_frequency, do_sky_coords=None):
+    """Create an empty image of a given size with one of the make_empty_* factories.
+
+    Mirrors the arguments used by
+    :func:`~xradio.testing.image.create_empty_test_image` (same phase center,
+    cell size, polarizations and time) but with an ``image_size`` x
+    ``image_size`` l/m (or u/v) grid and ``n_frequency`` channels, so that the
+    factories and accessors can be benchmarked at production image sizes.
+
+    ``do_sky_coords`` is only forwarded when not None, as
+    ``make_empty_aperture_image`` does not accept it.
+    """
+    cell_size = np.pi / 180 / 60
+    args = [
+        [0.2, -0.5],  # phase_center
+        [image_size, image_size],  # image_size
+        [cell_size, cell_size],  # cell_size
+        np.linspace(1.412e9, 1.413e9, n_frequency),  # frequency_coords
+        ["I", "Q", "U"],  # pol_coords
+        [54000.1],  # time_coords
+    ]
+    kwargs = {} if do_sky_coords is None else {"do_sky_coords": do_sky_coords}
+    return factory(*args, **kwargs)
+
+
+SKY_DIMS = ("time", "frequency", "polarization", "l", "m")
+
+
+def add_zero_sky(xds):
+    """Add a zero SKY data variable (and its data group) to an empty sky image.
+
+    The make_empty_* factories only create coordinates, and write_image
+    needs at least one image data variable. The zeros are a dask array
+    chunked per frequency, so that large images are written with bounded
+    memory.
+    """
+    shape = tuple(xds.sizes[dim] for dim in SKY_DIMS)
+    xds["SKY"] = xr.DataArray(
+        dask.array.zeros(shape, dtype=np.float32, chunks=shape[:1] + (1,) + shape[2:]),
+        dims=SKY_DIMS,
+    )
+    xds.attrs["data_groups"] = {"base": {"sky": "SKY"}}
+    return xds
@@ -0,0 +1,149 @@
+import contextlib
+import functools
+import inspect
+
+import zarr
+
+_METADATA_KEYS = (".zarray", ".zgroup", ".zattrs", ".zmetadata", "zarr.json")
+
+# numbers of zarr store calls
+IO_METRICS = [
+    "metadata_reads",
+    "chunk_reads",
+    "exists_calls",
+    "list_calls",
+    "writes",
+]
+# numbers of bytes transferred, reported by separate track_*_bytes benchmarks
+IO_BYTES_METRICS = ["bytes_read", "bytes_written"]
+
+
+def _is_metadata_key(key):
+    return key.rsplit("/", 1)[-1] in _METADATA_KEYS
+
+
+def _nbytes(value):
+    nbytes = getattr(value, "nbytes", None)
+    return nbytes if nbytes is not None else len(value)
+
+
+def _store_methods():
+    """Return the (class, method name, operation) triples through which zarr does I/O.
+
+    xradio only accepts store paths, so a store object cannot be injected;
+    instead the methods of the store classes zarr builds from a path are
+    wrapped. zarr 3 stores are async, zarr 2 stores are mappings.
+    """
+    if int(zarr.__version__.split(".")[0]) >= 3:
+        from zarr.storage import FsspecStore, LocalStore
+
+        methods = {
+            "get": "get",
+            "exists": "exists",
+            "list": "list",
+            "list_prefix": "list",
+            "list_dir": "list",
+            "set": "set",
+        }
+        classes = [LocalStore, FsspecStore]
+    else:
+        from zarr.storage import DirectoryStore, FSStore
+
+        methods = {
+            "__getitem__": "get",
+            "__contains__": "exists",
+            "listdir": "list",
+            "__setitem__": "set",
+        }
+        classes = [DirectoryStore, FSStore]
+    return [
+        (cls, name, operation)
+        for cls in classes
+        for name, operation in methods.items()
+        if name in cls.__dict__
+    ]
+
+
+class ZarrIOCounter:
+    """Counts the zarr store calls, and bytes transferred, made while it is active.
+
+    Reads are split into metadata reads (``.zarray``, ``.zattrs``,
+    ``zarr.json``, ...) and chunk reads. The counts do not depend on the
+    machine speed, so they can be trended per commit with ``track_``
+    benchmarks to show I/O amplification.
+    """
+
+    def __init__(self):
+        for metric in IO_METRICS + IO_BYTES_METRICS:
+            setattr(self, metric, 0)
+
+    def _record(self, operation, args, kwargs, result):
+        if operation == "get":
+            key = args[0] if args else kwargs["key"]
+            if _is_metadata_key(key):
+                self.metadata_reads += 1
+            else:
+                self.chunk_reads += 1
+            if result is not None:
+                self.bytes_read += _nbytes(result)
+        elif operation == "set":
+            value = args[1] if len(args) > 1 else kwargs["value"]
+            self.writes += 1
+            self.bytes_written += _nbytes(value)
+        elif operation == "exists":
+            self.exists_calls += 1
+        elif operation == "list":
+            self.list_calls += 1
+
+    def _wrap(self, method, operation):
+        if inspect.isasyncgenfunction(method):
+
+            @functools.wraps(method)
+            async def wrapper(store, *args, **kwargs):
+                self._record(operation, args, kwargs, None)
+                async for item in method(store, *args, **kwargs):
+                    yield item
+
+        elif inspect.iscoroutinefunction(method):
+
+            @functools.wraps(method)
+            async def wrapper(store, *args, **kwargs):
+                result = await method(store, *args, **kwargs)
+                self._record(operation, args, kwargs, result)
+                return result
+
+        else:
+
+            @functools.wraps(method)
+            def wrapper(store, *args, **kwargs):
+                result = None
+                try:
+                    result = method(store, *args, **kwargs)
+                    return result
+                finally:
+                    self._record(operation, args, kwargs, result)
+
+        return wrapper
+
+    @contextlib.contextmanager
+    def active(self):
+        """Context manager wrapping the zarr store methods with this counter."""
+        originals = [
+            (cls, name, operation, cls.__dict__[name])
+            for cls, name, operation in _store_methods()
+        ]
+        try:
+            for cls, name, operation, method in originals:
+                setattr(cls, name, self._wrap(method, operation))
+            yield self
+        finally:
+            for cls, name, _, method in originals:
+                setattr(cls, name, method)
+
+
+def count_zarr_io(func, *args, **kwargs):
+    """Call ``func`` and return the :class:`ZarrIOCounter` of the I/O it made."""
+    counter = ZarrIOCounter()
+    with counter.active():
+        func(*args, **kwargs)
+    return counter
@@ -0,0 +1,74 @@
+import gc
+import time
+
+import numpy as np
+
+PERCENTILES = (50, 95, 99)
+
+
+def latency_summary(latencies):
+    """Return the p50, p95, p99 and max of a list of latencies, keyed "p50", ..., "max"."""
+    latencies = np.asarray(latencies)
+    summary = {
+        f"p{q}": value
+        for q, value in zip(PERCENTILES, np.percentile(latencies, PERCENTILES))
+    }
+    summary["max"] = latencies.max()
+    return summary
+
+
+class _GCPauses:
+    """``gc.callbacks`` hook accumulating the time spent in garbage collections."""
+
+    def __init__(self):
+        self.total = 0.0
+        self._start = None
+
+    def __call__(self, phase, info):
+        if phase == "start":
+            self._start = time.perf_counter()
+        elif self._start is not None:
+            self.total += time.perf_counter() - self._start
+            self._start = None
+
+
+def measure_latencies(func, n_calls, n_warmup=10):
+    """Call ``func`` ``n_calls`` times, return the latency and GC pause of each call.
+
+    After ``n_warmup`` untimed calls, every call is timed separately and the
+    time spent in garbage collections triggered during the call is recorded
+    through :data:`gc.callbacks`, so that tail latencies can be attributed to
+    GC pauses (allocation-heavy code) or to the code itself. Returns two
+    arrays of seconds, ``(latencies, gc_pauses)``.
+    """
+    for _ in range(n_warmup):
+        func()
+    latencies = np.empty(n_calls)
+    gc_pauses = np.empty(n_calls)
+    pauses = _GCPauses()
+    gc.callbacks.append(pauses)
+    try:
+        for i in range(n_calls):
+            gc_before = pauses.total
+            start = time.perf_counter()
+            func()
+            latencies[i] = time.perf_counter() - start
+            gc_pauses[i] = pauses.total - gc_before
+    finally:
+        gc.callbacks.remove(pauses)
+    return latencies, gc_pauses
+
+
+def gc_pause_summary(latencies, gc_pauses):
+    """Return the fraction of the time spent in GC pauses, overall and in the tail.
+
+    Keyed "gc_fraction" for all the calls and "gc_fraction_p99" for the calls
+    at or above the p99 latency.
+    """
+    latencies = np.asarray(latencies)
+    gc_pauses = np.asarray(gc_pauses)
+    tail = latencies >= np.percentile(latencies, 99)
+    return {
+        "gc_fraction": gc_pauses.sum() / latencies.sum(),
+        "gc_fraction_p99": gc_pauses[tail].sum() / latencies[tail].sum(),
+    }
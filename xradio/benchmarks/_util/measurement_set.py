@@ -0,0 +1,160 @@
+import copy
+import glob
+import hashlib
+import inspect
+import math
+import os
+import shutil
+import sys
+
+import numpy as np
+
+# casacore is a dependency of the xradio MSv2 generators
+import casacore.tables as tables
+
+from xradio.testing.measurement_set import msv2_io
+from xradio.testing.measurement_set.msv2_io import default_ms_descr, gen_test_ms
+
+from .fixture_cache import cached_fixture
+
+# OBS_MODE given to the generated STATE rows, cycled through
+INTENTS = (
+    "OBSERVE_TARGET#ON_SOURCE",
+    "CALIBRATE_PHASE#ON_SOURCE",
+    "CALIBRATE_BANDPASS#ON_SOURCE",
+    "CALIBRATE_FLUX#ON_SOURCE",
+)
+# number of rows written per call when rewriting the main table columns
+_BATCH_ROWS = 200_000
+
+
+def synthetic_ms_bytes(n_times, n_spw=2, n_chan=16, n_antennas=5):
+    """Approximate size of the visibilities and flags of a :func:`gen_synthetic_ms` MS."""
+    n_rows = n_times * _n_baselines(n_antennas) * n_spw * len(default_ms_descr["POLARIZATION"])
+    npols = default_ms_descr["npols"]
+    # complex64 DATA and bool FLAG
+    return n_rows * n_chan * npols * (8 + 1)
+
+
+def _n_baselines(n_antennas):
+    return n_antennas * (n_antennas - 1) // 2
+
+
+def gen_synthetic_ms(
+    msname,
+    n_times,
+    n_spw=2,
+    n_chan=16,
+    n_antennas=5,
+    n_fields=1,
+    n_states=1,
+    n_scans=None,
+):
+    """Generate a synthetic MSv2 of configurable size and partition structure.
+
+    Extends the xradio test MS generator (``gen_test_ms``), which writes one
+    row per DDI and time and a single field, scan and state, to an MS with
+    ``n_times`` time steps, each with every baseline of ``n_antennas`` for
+    every SPW and polarization setup. The time steps are spread over
+    ``n_scans`` scans (``n_fields`` by default) which cycle through
+    ``n_fields`` fields (not ephemeris objects) and ``n_states`` states of
+    different intents, so that partitioning by FIELD_ID, SCAN_NUMBER,
+    STATE_ID or OBS_MODE yields several partitions.
+
+    The main table is grown by copying its first time step and the key
+    columns are rewritten in batches, so large MSs are generated with
+    bounded memory. Returns the path of the MS.
+    """
+    n_baselines = _n_baselines(n_antennas)
+    descr = copy.deepcopy(default_ms_descr)
+    descr.update(
+        nchans=n_chan,
+        # one time step of every baseline per DDI, grown below
+        nrows_per_ddi=n_baselines,
+        SPECTRAL_WINDOW={str(i): i for i in range(n_spw)},
+        ANTENNA={str(i): i for i in range(n_antennas)},
+        FIELD={str(i): i for i in range(n_fields)},
+        SOURCE={str(i): i for i in range(n_fields)},
+        STATE={
+            str(i): {"id": i, "intent": INTENTS[i % len(INTENTS)]}
+            for i in range(n_states)
+        },
+    )
+    gen_test_ms(
+        msname,
+        descr=descr,
+        opt_tables=True,
+        vlbi_tables=False,
+        required_only=True,
+        misbehave=False,
+    )
+
+    # gen_test_ms gives every field the ephemeris of a phony EPHEM table, and
+    # ephemeris fields are converted along time: drop it, so that the fields
+    # are converted along field_name, as the pointings of a mosaic
+    with tables.table(msname + "::FIELD", ack=False, readonly=False) as field:
+        if "EPHEMERIS_ID" in field.colnames():
+            field.removecols("EPHEMERIS_ID")
+    for ephem_table in glob.glob(os.path.join(msname, "FIELD", "EPHEM*.tab")):
+        shutil.rmtree(ephem_table)
+
+    with tables.table(msname + "::STATE", ack=False, readonly=False) as state:
+        state.putcol(
+            "OBS_MODE", [descr["STATE"][str(i)]["intent"] for i in range(n_states)]
+        )
+
+    n_scans = n_scans or n_fields
+    scan_length = math.ceil(n_times / n_scans)
+    with tables.table(msname, ack=False, readonly=False) as main:
+        rows_per_time = main.nrows()
+        start = main.getcell("TIME", 0)
+        # double the table until it holds n_times copies of the first time step
+        n_rows = n_times * rows_per_time
+        while main.nrows() < n_rows:
+            main.copyrows(main, nrow=min(main.nrows(), n_rows - main.nrows()))
+
+        for first in range(0, n_rows, _BATCH_ROWS):
+            n = min(_BATCH_ROWS, n_rows - first)
+            time_index = np.arange(first, first + n) // rows_per_time
+            scan_index = time_index // scan_length
+            time = start + time_index * main.getcell("INTERVAL", 0)
+            main.putcol("TIME", time, startrow=first, nrow=n)
+            main.putcol("TIME_CENTROID", time, startrow=first, nrow=n)
+            main.putcol("SCAN_NUMBER", scan_index + 1, startrow=first, nrow=n)
+            main.putcol("FIELD_ID", scan_index % n_fields, startrow=first, nrow=n)
+            main.putcol("STATE_ID", scan_index % n_states, startrow=first, nrow=n)
+    return msname
+
+
+def _synthetic_ms_generator_hash():
+    # the MS content only changes with gen_synthetic_ms (this module) and the
+    # xradio generator it extends
+    source = inspect.getsource(msv2_io) + inspect.getsource(sys.modules[__name__])
+    return hashlib.sha256(source.encode()).hexdigest()
+
+
+def cached_synthetic_ms(msname, n_times, **synthetic_kwargs):
+    """Return the path of a :func:`gen_synthetic_ms` MS from the fixture cache.
+
+    The MS is generated once per machine and shared by all commits and
+    environments whose generators are the same: the fixture is keyed on the
+    source of this module and of the xradio MSv2 generator, not on the xradio
+    commit being benchmarked. It must only be read; link it into the asv
+    cache directory with :func:`~.fixture_cache.link_fixture`.
+    """
+
+    def build(out_dir):
+        gen_synthetic_ms(os.path.join(out_dir, msname), n_times, **synthetic_kwargs)
+
+    entry = cached_fixture(
+        "synthetic_msv2",
+        {
+            "msname": msname,
+            "n_times": n_times,
+            "generator": _synthetic_ms_generator_hash(),
+            **synthetic_kwargs,
+        },
+        build,
+        versioned=False,
+    )
+    return os.path.join(entry, msname)
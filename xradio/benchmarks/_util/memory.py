@@ -0,0 +1,70 @@
+import os
+import subprocess
+import time
+import tracemalloc
+
+
+def traced_peak_bytes(func, *args, **kwargs):
+    """Return the peak number of bytes allocated while calling ``func``.
+
+    Uses :mod:`tracemalloc`, which numpy reports its data buffers to, so this
+    counts both Python objects and array allocations made by the call while
+    ignoring whatever was already allocated in setup. Meant to be returned from
+    asv ``track_`` benchmarks (``unit = "bytes"``).
+    """
+    tracemalloc.start()
+    try:
+        func(*args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def _rss_bytes(pid):
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (FileNotFoundError, ProcessLookupError):
+        # the process exited between two polls
+        return 0
+
+
+def run_under_memory_cap(args, cap_bytes, poll_interval=0.01):
+    """Run a command in a subprocess, killing it if its RSS exceeds ``cap_bytes``.
+
+    The cap is enforced by a watchdog polling the resident set size of the
+    process rather than with ``resource.setrlimit``: RLIMIT_AS limits virtual
+    memory, which numpy, dask and thread stacks reserve far beyond what they
+    use, and RLIMIT_RSS is not enforced by Linux.
+
+    Returns a dict with the ``wall_time`` (seconds), the ``peak_rss`` (bytes,
+    as reported by the kernel on exit, so peaks between two polls are not
+    missed) and whether the command ``completed`` successfully under the cap.
+    Raises NotImplementedError where the RSS of a process cannot be read
+    (no ``/proc``), which asv reports as a skipped benchmark.
+    """
+    if not os.path.exists("/proc/self/statm"):
+        raise NotImplementedError("RSS watchdog needs /proc")
+    start = time.perf_counter()
+    proc = subprocess.Popen(args)
+    killed = False
+    while True:
+        pid, status, rusage = os.wait4(proc.pid, os.WNOHANG)
+        if pid:
+            break
+        if _rss_bytes(proc.pid) > cap_bytes:
+            proc.kill()
+            killed = True
+            _, status, rusage = os.wait4(proc.pid, 0)
+            break
+        time.sleep(poll_interval)
+    wall_time = time.perf_counter() - start
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    # ru_maxrss is in kilobytes on Linux
+    peak_rss = rusage.ru_maxrss * 1024
+    return {
+        "wall_time": wall_time,
+        "peak_rss": peak_rss,
+        "completed": not killed and proc.returncode == 0 and peak_rss <= cap_bytes,
+    }
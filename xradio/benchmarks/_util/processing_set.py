@@ -0,0 +1,187 @@
+import json
+import os
+import shutil
+
+import xarray as xr
+import zarr
+
+from xradio.measurement_set import convert_msv2_to_processing_set
+from xradio.testing.measurement_set.io import download_measurement_set
+from xradio.testing.measurement_set.msv2_io import (
+    build_processing_set_from_msv2,
+    gen_minimal_ms,
+)
+
+from .fixture_cache import cached_fixture, link_fixture
+from .measurement_set import cached_synthetic_ms
+
+
+def convert_minimal_processing_set(out_file):
+    """Convert the minimal test MSv2 into a processing set at ``out_file``.
+
+    Returns the path of the processing set, which is used as the seed for
+    :func:`replicate_processing_set`.
+    """
+    ms_path, _ = gen_minimal_ms()
+    convert_msv2_to_processing_set(
+        ms_path,
+        out_file=out_file,
+        partition_scheme=[],
+        persistence_mode="w",
+        parallel_mode="none",
+    )
+    return out_file
+
+
+def convert_synthetic_processing_set(out_file, n_times, **synthetic_kwargs):
+    """Convert a synthetic MSv2 (see gen_synthetic_ms) into a processing set at ``out_file``.
+
+    The MSv2 comes from the fixture cache (see cached_synthetic_ms), linked
+    next to ``out_file``, and is converted without partition_scheme, into one
+    partition per SPW, polarization setup and intent. Returns the path of the
+    processing set.
+    """
+    ms_name = os.path.basename(out_file).replace(".ps.zarr", ".ms")
+    ms_path = link_fixture(
+        cached_synthetic_ms(ms_name, n_times, **synthetic_kwargs),
+        os.path.join(os.path.dirname(out_file), ms_name),
+    )
+    convert_msv2_to_processing_set(
+        ms_path,
+        out_file=out_file,
+        partition_scheme=[],
+        persistence_mode="w",
+        parallel_mode="none",
+    )
+    return out_file
+
+
+def list_partitions(ps_path):
+    """Return the sorted names of the MSv4 partitions in a processing set store."""
+    return sorted(
+        name
+        for name in os.listdir(ps_path)
+        if os.path.isdir(os.path.join(ps_path, name))
+    )
+
+
+def replicate_processing_set(seed_ps, out_ps, n_partitions, consolidated=True):
+    """Build a processing set with ``n_partitions`` copies of a seed partition.
+
+    The first MSv4 partition of ``seed_ps`` (together with all its
+    sub-datasets: antenna, field and source, weather, ...) is copied
+    ``n_partitions`` times under new names, which is much cheaper than
+    converting an MSv2 with that many partitions but yields a store with the
+    same layout and number of zarr groups and arrays.
+
+    With ``consolidated=True`` the metadata of the new store is consolidated
+    at the root; otherwise any consolidated metadata is removed so that
+    readers have to visit every group and array.
+    """
+    template = list_partitions(seed_ps)[0]
+    for path in partition_paths(seed_ps, out_ps, n_partitions):
+        shutil.copytree(os.path.join(seed_ps, template), path)
+
+    set_consolidated_metadata(out_ps, consolidated)
+    return out_ps
+
+
+def partition_paths(seed_ps, out_ps, n_partitions):
+    """Start an empty processing set store, return the paths of its partitions.
+
+    The root group metadata of ``seed_ps`` is copied into a new ``out_ps``,
+    and the paths of ``n_partitions`` partitions named after the first
+    partition of ``seed_ps`` are returned, for the caller to write.
+    """
+    basename = list_partitions(seed_ps)[0].rsplit("_", 1)[0]
+    shutil.rmtree(out_ps, ignore_errors=True)
+    os.makedirs(out_ps)
+    for name in os.listdir(seed_ps):
+        src = os.path.join(seed_ps, name)
+        if os.path.isfile(src):
+            shutil.copy(src, os.path.join(out_ps, name))
+    return [os.path.join(out_ps, f"{basename}_{i}") for i in range(n_partitions)]
+
+
+def _zarr_v3():
+    return int(zarr.__version__.split(".")[0]) >= 3
+
+
+def zarr_format_supported(zarr_format):
+    """Return whether the installed zarr writes stores in ``zarr_format`` (2 or 3)."""
+    return zarr_format == 2 or _zarr_v3()
+
+
+def rewrite_zarr_store(src, dst, zarr_format):
+    """Rewrite a local zarr store (processing set, image, ...) in another zarr format.
+
+    Every group and array of ``src`` is written to ``dst`` with the default
+    encoding of ``zarr_format``, without consolidated metadata.
+    """
+    tree = xr.open_datatree(src, engine="zarr")
+    tree = tree.map_over_datasets(lambda ds: ds.drop_encoding())
+    # zarr 2 only writes (and xarray only takes zarr_format with zarr 3) format 2
+    kwargs = {"zarr_format": zarr_format} if _zarr_v3() else {}
+    tree.to_zarr(dst, mode="w", consolidated=False, **kwargs)
+    return dst
+
+
+def set_consolidated_metadata(store_path, consolidated):
+    """Consolidate the metadata of a local store at its root, or remove it."""
+    if consolidated:
+        zarr.consolidate_metadata(store_path)
+    else:
+        remove_consolidated_metadata(store_path)
+
+
+def remove_consolidated_metadata(store_path):
+    """Remove consolidated metadata (zarr v2 or v3 format) from a local store."""
+    for dirpath, _, filenames in os.walk(store_path):
+        if ".zmetadata" in filenames:
+            os.remove(os.path.join(dirpath, ".zmetadata"))
+        if "zarr.json" in filenames:
+            zarr_json = os.path.join(dirpath, "zarr.json")
+            with open(zarr_json) as f:
+                meta = json.load(f)
+            if meta.get("consolidated_metadata") is not None:
+                meta["consolidated_metadata"] = None
+                with open(zarr_json, "w") as f:
+                    json.dump(meta, f, indent=2)
+
+
+def cached_measurement_set(ms_name):
+    """Return the path of a downloaded test MSv2, downloading it only once per machine.
+
+    The download does not depend on the xradio version, so it is shared by
+    all commits.
+    """
+
+    def download(out_dir):
+        ms_path = os.path.abspath(download_measurement_set(ms_name))
+        if os.path.dirname(ms_path) != out_dir:
+            shutil.move(ms_path, out_dir)
+
+    entry = cached_fixture("msv2", {"ms_name": ms_name}, download, versioned=False)
+    return os.path.join(entry, ms_name)
+
+
+def cached_processing_set_from_msv2(ms_name, **build_kwargs):
+    """Return the path of a processing set converted from a test MSv2, from the fixture cache.
+
+    ``build_kwargs`` are passed to ``build_processing_set_from_msv2``; they
+    and the xradio commit being benchmarked form the cache key, so classes
+    converting the same MS with the same options share one conversion.
+    """
+    ms_path = cached_measurement_set(ms_name)
+
+    def build(out_dir):
+        build_processing_set_from_msv2(
+            in_file=ms_path,
+            out_file=os.path.join(out_dir, "processing_set.ps.zarr"),
+            **build_kwargs,
+        )
+
+    entry = cached_fixture(
+        "processing_set", {"ms_name": ms_name, **build_kwargs}, build
+    )
+    return os.path.join(entry, "processing_set.ps.zarr")
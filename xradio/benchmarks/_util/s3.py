@@ -0,0 +1,90 @@
+import os
+import threading
+import time
+
+
+class LocalS3Server:
+    """S3-compatible server on localhost backed by moto, for object storage benchmarks.
+
+    Runs moto's S3 WSGI application in a background thread behind a small
+    middleware that counts HTTP requests and optionally sleeps ``latency``
+    seconds before answering each one, to model WAN round trips.
+
+    moto (with its server extra) and s3fs are optional dependencies; when they
+    are not importable :meth:`start` raises NotImplementedError, which asv
+    reports as a skipped benchmark when raised from ``setup``.
+    """
+
+    bucket = "benchviper"
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.request_count = 0
+        self.endpoint_url = None
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    def _app(self, app):
+        def counting_app(environ, start_response):
+            with self._lock:
+                self.request_count += 1
+            if self.latency:
+                time.sleep(self.latency)
+            return app(environ, start_response)
+
+        return counting_app
+
+    def start(self):
+        """Start the server and point s3fs/botocore clients of this process at it."""
+        try:
+            import fsspec
+            import s3fs  # noqa: F401
+            from moto.server import DomainDispatcherApplication, create_backend_app
+            from werkzeug.serving import make_server
+        except ImportError as exc:
+            raise NotImplementedError(f"S3 benchmarks need moto[server] and s3fs: {exc}")
+
+        app = DomainDispatcherApplication(create_backend_app, service="s3")
+        self._server = make_server("127.0.0.1", 0, self._app(app), threaded=True)
+        self.endpoint_url = f"http://127.0.0.1:{self._server.server_port}"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+        # xradio creates its own s3fs filesystems from "s3://" urls, so the
+        # endpoint and (dummy) credentials are set through the environment
+        # and the fsspec configuration rather than passed explicitly
+        os.environ["AWS_ACCESS_KEY_ID"] = "benchviper"
+        os.environ["AWS_SECRET_ACCESS_KEY"] = "benchviper"
+        os.environ["AWS_ENDPOINT_URL"] = self.endpoint_url
+        fsspec.config.conf.setdefault("s3", {})["endpoint_url"] = self.endpoint_url
+
+        self.filesystem().makedirs(self.bucket, exist_ok=True)
+        return self
+
+    def stop(self):
+        import fsspec
+        import s3fs
+
+        self._server.shutdown()
+        self._thread.join()
+        fsspec.config.conf.get("s3", {}).pop("endpoint_url", None)
+        os.environ.pop("AWS_ENDPOINT_URL", None)
+        s3fs.S3FileSystem.clear_instance_cache()
+
+    def filesystem(self):
+        import s3fs
+
+        return s3fs.S3FileSystem(endpoint_url=self.endpoint_url)
+
+    def upload(self, local_path, name):
+        """Copy a local store into the bucket and return its ``s3://`` url."""
+        self.filesystem().put(local_path, f"{self.bucket}/{name}", recursive=True)
+        return self.url(name)
+
+    def url(self, name):
+        return f"s3://{self.bucket}/{name}"
+
+    def reset_request_count(self):
+        with self._lock:
+            self.request_count = 0
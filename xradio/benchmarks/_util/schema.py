@@ -0,0 +1,129 @@
+import importlib
+import inspect
+import os
+import sys
+
+from xradio.schema.bases import is_dataset_schema
+
+
+def dataset_schema_classes(module):
+    """Return the ``@xarray_dataset_schema`` classes defined in a module, by name."""
+    return [
+        klass
+        for _, klass in sorted(inspect.getmembers(module, is_dataset_schema))
+        if klass.__module__ == module.__name__
+    ]
+
+
+def generated_schema_source(n_coords, n_data_vars, n_attrs, depth):
+    """Return the source of a module with a large generated dataset schema.
+
+    The module defines ``n_coords`` (at least 2) coordinate and
+    ``n_data_vars`` data variable array schemas, each with ``n_attrs``
+    attributes, a chain of ``depth`` nested dict schemas, and a
+    ``LargeDatasetSchema`` dataset schema referring to all of them through
+    ``Coordof``/``Dataof`` and ``Attr``.
+
+    Schema classes are derived from their source (for the field docstrings),
+    so they cannot be created with ``type()`` but have to be written to a
+    module file, see :func:`write_schema_module`.
+    """
+    lines = [
+        "from typing import Literal, Optional",
+        "",
+        "from xradio.schema.bases import (",
+        "    dict_schema,",
+        "    xarray_dataarray_schema,",
+        "    xarray_dataset_schema,",
+        ")",
+        "from xradio.schema.typing import Attr, Coordof, Data, Dataof",
+        "",
+    ]
+    for i in range(n_coords):
+        lines.append(f'Dim{i} = Literal["dim_{i}"]')
+    lines.append("")
+
+    def attributes(prefix):
+        # required attributes first, as fields with defaults must follow them
+        for k in range(0, n_attrs, 2):
+            lines.extend([f"    {prefix}attr_{k}: Attr[str]", f'    """Attribute {k}"""'])
+        for k in range(1, n_attrs, 2):
+            lines.extend(
+                [
+                    f"    {prefix}attr_{k}: Optional[Attr[int]] = None",
+                    f'    """Attribute {k}"""',
+                ]
+            )
+
+    for i in range(n_coords):
+        lines += [
+            "",
+            "@xarray_dataarray_schema",
+            f"class CoordArray{i}:",
+            f'    """Coordinate {i}"""',
+            "",
+            f"    data: Data[Dim{i}, float]",
+            '    """Coordinate values"""',
+        ]
+        attributes("")
+    for j in range(n_data_vars):
+        dims = f"tuple[Dim{j % n_coords}, Dim{(j + 1) % n_coords}]"
+        lines += [
+            "",
+            "@xarray_dataarray_schema",
+            f"class DataArray{j}:",
+            f'    """Data variable {j}"""',
+            "",
+            f"    data: Data[{dims}, complex]",
+            '    """Data values"""',
+        ]
+        attributes("")
+    for d in reversed(range(depth)):
+        lines += [
+            "",
+            "@dict_schema",
+            f"class InfoDict{d}:",
+            f'    """Info dict at depth {d}"""',
+            "",
+        ]
+        for k in range(n_attrs):
+            lines += [f"    field_{k}: str", f'    """Field {k}"""']
+        if d + 1 < depth:
+            lines += [f"    nested: InfoDict{d + 1}", '    """Nested dict"""']
+    lines += [
+        "",
+        "@xarray_dataset_schema",
+        "class LargeDatasetSchema:",
+        '    """Generated dataset schema"""',
+        "",
+    ]
+    for i in range(n_coords):
+        lines += [f"    dim_{i}: Coordof[CoordArray{i}]", f'    """Coordinate {i}"""']
+    # even data variables are required, odd ones optional (after the
+    # required attributes)
+    for j in range(0, n_data_vars, 2):
+        lines += [f"    DATA_{j}: Dataof[DataArray{j}]", f'    """Data variable {j}"""']
+    if depth:
+        lines += ["    info: Attr[InfoDict0]", '    """Nested info"""']
+    attributes("dataset_")
+    for j in range(1, n_data_vars, 2):
+        lines += [
+            f"    DATA_{j}: Optional[Dataof[DataArray{j}]] = None",
+            f'    """Data variable {j}"""',
+        ]
+    return "\n".join(lines) + "\n"
+
+
+def write_schema_module(directory, name, **kwargs):
+    """Write a :func:`generated_schema_source` module into ``directory``, return its path."""
+    path = os.path.join(directory, f"{name}.py")
+    with open(path, "w") as f:
+        f.write(generated_schema_source(**kwargs))
+    return path
+
+
+def import_schema_module(directory, name):
+    """Import a module written by :func:`write_schema_module`."""
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+    return importlib.import_module(name)
@@ -0,0 +1,58 @@
+import os
+import shutil
+import tempfile
+
+SCRATCH_ENV = "BENCHVIPER_SCRATCH_DIR"
+# value of BENCHVIPER_SCRATCH_DIR selecting the shared memory tmpfs
+TMPFS = "tmpfs"
+TMPFS_ROOT = "/dev/shm"
+
+
+def scratch_root():
+    """Return the directory under which benchmark outputs are written.
+
+    ``BENCHVIPER_SCRATCH_DIR`` may point to a directory on a fast local
+    device, or be ``tmpfs`` to write into ``/dev/shm``. It defaults to the
+    system temporary directory, where write benchmarks have always written.
+    """
+    root = os.environ.get(SCRATCH_ENV) or tempfile.gettempdir()
+    if root == TMPFS:
+        root = TMPFS_ROOT
+    os.makedirs(root, exist_ok=True)
+    return root
+
+
+def scratch_dir(name="bench"):
+    """Create a new empty scratch directory and return its absolute path.
+
+    Every call gets its own directory, named after the process, so that
+    benchmarks running concurrently (``asv run --parallel``) never write
+    into each other's outputs. Remove it with :func:`remove_scratch_dir`.
+    """
+    return tempfile.mkdtemp(prefix=f"benchviper-{name}-{os.getpid()}-", dir=scratch_root())
+
+
+def remove_scratch_dir(path):
+    shutil.rmtree(path, ignore_errors=True)
+
+
+def filesystem_type(path):
+    """Return the type of the filesystem holding ``path`` (e.g. "ext4", "tmpfs").
+
+    Reads the mount table, so it is only available on Linux; returns None
+    elsewhere.
+    """
+    path = os.path.realpath(path)
+    try:
+        with open("/proc/self/mounts") as f:
+            mounts = [line.split()[1:3] for line in f]
+    except OSError:
+        return None
+    best, fstype = "", None
+    for mount_point, mount_type in mounts:
+        mount_point = mount_point.replace("\\040", " ")
+        if (path == mount_point or path.startswith(mount_point.rstrip("/") + "/")) and len(
+            mount_point
+        ) > len(best):
+            best, fstype = mount_point, mount_type
+    return fstype
@@ -0,0 +1,129 @@
+import gc
+import json
+import os
+import subprocess
+import sys
+import tracemalloc
+
+import numpy as np
+
+from .memory import _rss_bytes
+
+
+def _open_image(store):
+    from xradio.image import open_image
+
+    def cycle():
+        open_image(store).close()
+
+    return cycle
+
+
+def _load_processing_set(store):
+    from xradio.measurement_set import load_processing_set
+
+    def cycle():
+        load_processing_set(store).close()
+
+    return cycle
+
+
+def _check_datatree(store):
+    from xradio.measurement_set import load_processing_set
+    from xradio.schema.check import check_datatree
+
+    ps_xdt = load_processing_set(store)
+
+    def cycle():
+        check_datatree(ps_xdt)
+
+    return cycle
+
+
+# name -> function of a store path returning the call repeated by the soak
+WORKLOADS = {
+    "open_image_zarr": _open_image,
+    "open_image_casa": _open_image,
+    "load_processing_set": _load_processing_set,
+    "check_datatree": _check_datatree,
+}
+
+
+def _open_fds():
+    return len(os.listdir("/proc/self/fd"))
+
+
+def soak(func, n_iterations, sample_every=10, n_warmup=10, n_traced=None, n_top=10):
+    """Call ``func`` repeatedly and return how the memory and open files grow.
+
+    After ``n_warmup`` calls (filling caches that legitimately stay), the
+    RSS and number of open file descriptors are sampled after a garbage
+    collection every ``sample_every`` of ``n_iterations`` calls, and their
+    growth per call is the slope of a linear fit. Then ``n_traced`` more
+    calls (``n_iterations // 4`` by default, tracing is slow) are made under
+    :mod:`tracemalloc`, whose snapshots before and after give the growth of
+    the Python and numpy allocations per call and the ``n_top`` source lines
+    whose allocations grew most.
+    """
+    for _ in range(n_warmup):
+        func()
+    iterations, rss, fds = [], [], []
+    for i in range(n_iterations):
+        func()
+        if i % sample_every == 0 or i == n_iterations - 1:
+            gc.collect()
+            iterations.append(i)
+            rss.append(_rss_bytes(os.getpid()))
+            fds.append(_open_fds())
+
+    n_traced = n_traced or max(n_iterations // 4, 1)
+    tracemalloc.start()
+    try:
+        gc.collect()
+        before = tracemalloc.take_snapshot()
+        for _ in range(n_traced):
+            func()
+        gc.collect()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    growth = after.compare_to(before, "lineno")
+
+    return {
+        "rss_slope": float(np.polyfit(iterations, rss, 1)[0]),
+        "rss_growth": rss[-1] - rss[0],
+        "fd_slope": float(np.polyfit(iterations, fds, 1)[0]),
+        "fd_growth": fds[-1] - fds[0],
+        "traced_slope": sum(stat.size_diff for stat in growth) / n_traced,
+        "top_growth": [str(stat) for stat in growth[:n_top]],
+    }
+
+
+def run_soak(workload, store, n_iterations):
+    """Run :func:`soak` on one of the :data:`WORKLOADS` in a fresh interpreter.
+
+    The RSS and file descriptors of a fresh process only grow with the
+    workload, not with whatever the asv process (or an earlier workload)
+    allocated. Raises NotImplementedError without ``/proc``, which asv
+    reports as a skipped benchmark.
+    """
+    if not os.path.exists("/proc/self/fd"):
+        raise NotImplementedError("soak benchmarks need /proc")
+    # run this module as a script, from the directory the benchmark package is in
+    root = os.path.dirname(sys.modules[__name__.split(".")[0]].__path__[0])
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [root, env.get("PYTHONPATH")]))
+    output = subprocess.run(
+        [sys.executable, "-m", __name__, workload, store, str(n_iterations)],
+        env=env,
+        check=True,
+        stdout=subprocess.PIPE,
+        text=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+if __name__ == "__main__":
+    workload, store, n_iterations = sys.argv[1:]
+    result = soak(WORKLOADS[workload](store), int(n_iterations))
+    print(json.dumps(result))
@@ -0,0 +1,123 @@
+import xarray as xr
+
+from xradio.measurement_set import load_processing_set
+from xradio.testing.measurement_set.msv2_io import (
+    build_minimal_msv4_xdt,
+    gen_minimal_ms,
+)
+
+from ._util.fixture_cache import link_fixture
+from ._util.latency import gc_pause_summary, latency_summary, measure_latencies
+from ._util.processing_set import cached_processing_set_from_msv2
+from .image_xds import _make_valid_image_dataset
+
+
+class TestAccessorLatency:
+    """
+    Latency distribution of interactive accessor calls.
+
+    These accessors sit behind interactive tools, where the slowest calls
+    matter more than the mean or median asv reports for time_ benchmarks.
+    Every accessor is called n_calls times in a row, each call timed
+    separately, and the p50, p95, p99 and max latency are reported, together
+    with the share of the time spent in garbage collection pauses (see
+    gc.callbacks), overall and in the calls at or above the p99 latency, so
+    that jitter from allocation-heavy code shows up as a regression.
+    """
+
+    version = "xradio 1.0.2"
+
+    params = ["summary", "query", "get_partition_info", "get_lm_cell_size"]
+    param_names = ["accessor"]
+
+    MeasurementSet = "Antennae_North.cal.lsrk.split.ms"
+    processing_set = "test_accessor_latency.ps.zarr"
+    n_calls = 2000
+
+    def setup_cache(self):
+        # perform the expensive operations once (per env, per commit), see
+        # https://asv.readthedocs.io/en/stable/writing_benchmarks.html#setup-and-teardown-functions
+
+        # the n_calls calls of every accessor are timed here, once, and the
+        # track_ benchmarks report statistics of the same latencies
+        ps_path = cached_processing_set_from_msv2(
+            self.MeasurementSet,
+            partition_scheme=[],
+            persistence_mode="w",
+            parallel_mode="none",
+            main_chunksize=0.01,
+            pointing_chunksize=0.00001,
+            pointing_interpolate=True,
+            ephemeris_interpolate=True,
+            use_table_iter=False,
+        )
+        link_fixture(ps_path, self.processing_set)
+        ps_xdt = load_processing_set(self.processing_set)
+        ms_name = list(ps_xdt.children.keys())[0]
+
+        ms_path, _ = gen_minimal_ms()
+        msv4_xdt = xr.open_datatree(
+            build_minimal_msv4_xdt(
+                ms_path,
+                partition_kwargs={
+                    "DATA_DESC_ID": [0],
+                    "OBS_MODE": ["CAL_ATMOSPHERE#ON_SOURCE"],
+                },
+            ),
+            engine="zarr",
+        )
+
+        image_xds = _make_valid_image_dataset()
+
+        accessors = {
+            "summary": lambda: ps_xdt.xr_ps.summary(),
+            "query": lambda: ps_xdt.xr_ps.query(name=ms_name),
+            "get_partition_info": lambda: msv4_xdt.xr_ms.get_partition_info(),
+            "get_lm_cell_size": lambda: image_xds.xr_img.get_lm_cell_size(),
+        }
+        cache = {}
+        for accessor, func in accessors.items():
+            latencies, gc_pauses = measure_latencies(func, self.n_calls)
+            cache[accessor] = {
+                **latency_summary(latencies),
+                **gc_pause_summary(latencies, gc_pauses),
+            }
+        return cache
+
+    setup_cache.timeout = 1800
+
+    def track_latency_p50(self, cache, accessor):
+        """Median latency of the accessor"""
+        return cache[accessor]["p50"]
+
+    track_latency_p50.unit = "seconds"
+
+    def track_latency_p95(self, cache, accessor):
+        """95th percentile of the latency of the accessor"""
+        return cache[accessor]["p95"]
+
+    track_latency_p95.unit = "seconds"
+
+    def track_latency_p99(self, cache, accessor):
+        """99th percentile of the latency of the accessor"""
+        return cache[accessor]["p99"]
+
+    track_latency_p99.unit = "seconds"
+
+    def track_latency_max(self, cache, accessor):
+        """Maximum latency of the accessor"""
+        return cache[accessor]["max"]
+
+    track_latency_max.unit = "seconds"
+
+    def track_gc_fraction(self, cache, accessor):
+        """Fraction of the time of all the calls spent in GC pauses"""
+        return cache[accessor]["gc_fraction"]
+
+    track_gc_fraction.unit = "fraction"
+
+    def track_gc_fraction_p99(self, cache, accessor):
+        """Fraction of the time of the calls at or above the p99 latency spent in GC pauses"""
+        return cache[accessor]["gc_fraction_p99"]
+
+    track_gc_fraction_p99.unit = "fraction"
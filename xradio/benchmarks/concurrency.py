@@ -0,0 +1,285 @@
+import os
+import time
+
+import numpy as np
+import zarr
+
+from xradio.image import make_empty_sky_image, write_image
+from xradio.measurement_set import convert_msv2_to_processing_set
+
+from ._util.concurrency import (
+    OPENERS,
+    ConcurrentReaders,
+    ConcurrentWriters,
+    find_zarr_array,
+)
+from ._util.image import add_zero_sky, make_scaled_empty_image
+from ._util.latency import latency_summary
+from ._util.fixture_cache import link_fixture
+from ._util.measurement_set import cached_synthetic_ms
+from ._util.processing_set import (
+    convert_minimal_processing_set,
+    list_partitions,
+    partition_paths,
+    replicate_processing_set,
+)
+from ._util.scratch import remove_scratch_dir, scratch_dir
+
+
+def _store_bytes(store_path):
+    return sum(
+        os.path.getsize(os.path.join(dirpath, filename))
+        for dirpath, _, filenames in os.walk(store_path)
+        for filename in filenames
+    )
+
+
+class TestConcurrentReaders:
+    """
+    Concurrent selections and computes on one processing set.
+
+    A service answering many visibility requests shares one opened
+    processing set between threads, where the GIL and any lock in the xradio,
+    xarray, dask or zarr read path serialize the requests; processes each
+    open the processing set once and do not share anything. Each request
+    selects every other time step of the visibilities of one partition and
+    reduces them. Reports the aggregate throughput and the p50/p95/p99
+    request latency of n_requests requests spread over the partitions, each
+    of the n_workers issuing its requests back to back (see
+    ConcurrentReaders.run).
+    """
+
+    version = "xradio 1.0.2"
+    timeout = 600
+    number = 1
+    warmup_time = 0
+
+    params = (list(OPENERS), ["thread", "process"], [1, 2, 4, 8])
+    param_names = ["opener", "executor", "n_workers"]
+
+    n_partitions = 16
+    n_requests = 256
+
+    def setup_cache(self):
+        # perform the expensive operations once (per env, per commit), see
+        # https://asv.readthedocs.io/en/stable/writing_benchmarks.html#setup-and-teardown-functions
+        seed = convert_minimal_processing_set("test_concurrency_seed.ps.zarr")
+        return replicate_processing_set(
+            seed, "test_concurrency.ps.zarr", self.n_partitions
+        )
+
+    def setup(self, ps_path, opener, executor, n_workers):
+        self.readers = ConcurrentReaders(executor, n_workers, opener, ps_path)
+        partitions = list_partitions(ps_path)
+        self.requests = [
+            partitions[i % len(partitions)] for i in range(self.n_requests)
+        ]
+
+    def teardown(self, ps_path, opener, executor, n_workers):
+        self.readers.shutdown()
+
+    def track_throughput(self, ps_path, opener, executor, n_workers):
+        """Requests completed per second"""
+        wall_time, _ = self.readers.run(self.requests)
+        return self.n_requests / wall_time
+
+    track_throughput.unit = "requests/s"
+
+    def track_latency_p50(self, ps_path, opener, executor, n_workers):
+        """Median request latency"""
+        _, latencies = self.readers.run(self.requests)
+        return latency_summary(latencies)["p50"]
+
+    track_latency_p50.unit = "seconds"
+
+    def track_latency_p95(self, ps_path, opener, executor, n_workers):
+        """95th percentile of the request latency"""
+        _, latencies = self.readers.run(self.requests)
+        return latency_summary(latencies)["p95"]
+
+    track_latency_p95.unit = "seconds"
+
+    def track_latency_p99(self, ps_path, opener, executor, n_workers):
+        """99th percentile of the request latency"""
+        _, latencies = self.readers.run(self.requests)
+        return latency_summary(latencies)["p99"]
+
+    track_latency_p99.unit = "seconds"
+
+
+class TestConcurrentPartitionWriters:
+    """
+    Processes writing separate MSv4 partitions into one processing set store.
+
+    A parallel conversion writes many partitions at once into the same
+    store. n_partitions copies of a partition of a synthetic MS are written
+    by n_workers processes, each holding the partition in memory, so that
+    only the zarr writes are measured: the aggregate bandwidth (bytes stored
+    over the wall time), the time spent writing the zarr metadata of each
+    partition (which grows with the contention on the store), and the time
+    to consolidate the metadata of the store once every partition is
+    written. The three come from the same writes, made once per n_workers
+    in setup_cache.
+    """
+
+    version = "xradio 1.0.2"
+    timeout = 900
+
+    params = [1, 2, 4, 8]
+    param_names = ["n_workers"]
+
+    n_partitions = 16
+
+    def setup_cache(self):
+        # perform the expensive operations once (per env, per commit), see
+        # https://asv.readthedocs.io/en/stable/writing_benchmarks.html#setup-and-teardown-functions
+        ms_path = link_fixture(
+            cached_synthetic_ms(
+                "test_concurrent_writers.ms", 100, n_spw=1, n_chan=256, n_antennas=10
+            ),
+            "test_concurrent_writers.ms",
+        )
+        # the writer processes need absolute paths
+        seed = os.path.abspath("test_concurrent_writers_seed.ps.zarr")
+        convert_msv2_to_processing_set(
+            ms_path,
+            out_file=seed,
+            partition_scheme=[],
+            persistence_mode="w",
+            parallel_mode="none",
+        )
+        # the writes are made here, once per n_workers, as every run is
+        # reported by several track_ benchmarks
+        return {n_workers: self._write(seed, n_workers) for n_workers in self.params}
+
+    setup_cache.timeout = 1800
+
+    def _write(self, seed, n_workers):
+        tmp_dir = scratch_dir("concurrent-writers")
+        writers = ConcurrentWriters(
+            "partition",
+            n_workers,
+            os.path.join(seed, list_partitions(seed)[0]),
+            [(os.path.join(tmp_dir, f"warmup_{i}"),) for i in range(n_workers)],
+        )
+        try:
+            out_ps = os.path.join(tmp_dir, "test_concurrent_writers.ps.zarr")
+            paths = partition_paths(seed, out_ps, self.n_partitions)
+            wall_time, times = writers.run([(path,) for path in paths])
+            start = time.perf_counter()
+            zarr.consolidate_metadata(out_ps)
+            consolidate_time = time.perf_counter() - start
+            return {
+                "bandwidth": _store_bytes(out_ps) / 1024**2 / wall_time,
+                "metadata_time": np.mean(
+                    [metadata_time for metadata_time, _ in times]
+                ),
+                "consolidate_time": consolidate_time,
+            }
+        finally:
+            writers.shutdown()
+            remove_scratch_dir(tmp_dir)
+
+    def track_write_bandwidth(self, results, n_workers):
+        """Aggregate write bandwidth of all the writers, in bytes stored"""
+        return results[n_workers]["bandwidth"]
+
+    track_write_bandwidth.unit = "MiB/s"
+
+    def track_metadata_time_per_partition(self, results, n_workers):
+        """Mean time a writer spends writing the zarr metadata of a partition"""
+        return results[n_workers]["metadata_time"]
+
+    track_metadata_time_per_partition.unit = "seconds"
+
+    def track_consolidate_time(self, results, n_workers):
+        """Time to consolidate the metadata of the store after the writes"""
+        return results[n_workers]["consolidate_time"]
+
+    track_consolidate_time.unit = "seconds"
+
+
+class TestConcurrentImageSlabWriters:
+    """
+    Processes writing separate frequency slabs into one image store.
+
+    A zarr image with image_size x image_size pixels and n_frequency
+    channels, one chunk per channel, is laid out by write_image, then every
+    channel of its SKY array is written by one of n_workers processes, each
+    holding a random slab in memory. Reports the aggregate bandwidth (bytes
+    of pixel data over the wall time) and the time to consolidate the
+    metadata of the store after the writes, both from the same writes, made
+    once per n_workers in setup_cache.
+    """
+
+    version = "xradio 1.0.2"
+    timeout = 900
+
+    params = [1, 2, 4, 8]
+    param_names = ["n_workers"]
+
+    image_size = 1024
+    n_frequency = 32
+
+    def setup_cache(self):
+        # perform the expensive operations once (per env, per commit), see
+        # https://asv.readthedocs.io/en/stable/writing_benchmarks.html#setup-and-teardown-functions
+
+        # the writes are made here, once per n_workers, as every run is
+        # reported by several track_ benchmarks
+        return {n_workers: self._write(n_workers) for n_workers in self.params}
+
+    setup_cache.timeout = 1800
+
+    def _write(self, n_workers):
+        tmp_dir = scratch_dir("concurrent-writers")
+        try:
+            image = os.path.join(tmp_dir, "test_concurrent_writers.img.zarr")
+            write_image(
+                add_zero_sky(
+                    make_scaled_empty_image(
+                        make_empty_sky_image, self.image_size, self.n_frequency
+                    )
+                ),
+                image,
+                out_format="zarr",
+                overwrite=True,
+            )
+            sky_path = find_zarr_array(image, "SKY")
+            sky = zarr.open_array(sky_path, mode="r")
+            if sky.chunks[1] != 1:
+                raise NotImplementedError(
+                    "SKY is not written with one chunk per channel"
+                )
+            slab_shape = (sky.shape[0], 1) + sky.shape[2:]
+            slab_bytes = np.prod(slab_shape) * np.dtype(np.float32).itemsize
+            writers = ConcurrentWriters(
+                "slab", n_workers, slab_shape, [(sky_path, i) for i in range(n_workers)]
+            )
+            try:
+                wall_time, _ = writers.run(
+                    [(sky_path, index) for index in range(self.n_frequency)]
+                )
+            finally:
+                writers.shutdown()
+            start = time.perf_counter()
+            zarr.consolidate_metadata(image)
+            consolidate_time = time.perf_counter() - start
+        finally:
+            remove_scratch_dir(tmp_dir)
+        return {
+            "bandwidth": slab_bytes * self.n_frequency / 1024**2 / wall_time,
+            "consolidate_time": consolidate_time,
+        }
+
+    def track_write_bandwidth(self, results, n_workers):
+        """Aggregate write bandwidth of all the writers, in bytes of pixel data"""
+        return results[n_workers]["bandwidth"]
+
+    track_write_bandwidth.unit = "MiB/s"
+
+    def track_consolidate_time(self, results, n_workers):
+        """Time to consolidate the metadata of the store after the writes"""
+        return results[n_workers]["consolidate_time"]
+
+    track_consolidate_time.unit = "seconds"
@@ -1,4 +1,9 @@
+import json
+import math
+import os
 import shutil
+import sys
+import time
 import xarray as xr
 
 from xradio.measurement_set import (
@@ -9,6 +14,13 @@ from xradio.measurement_set import (
 from xradio.schema.check import check_datatree
 from xradio.testing.measurement_set.msv2_io import gen_minimal_ms, gen_test_ms
 
+from ._util.io_counting import IO_BYTES_METRICS, IO_METRICS, count_zarr_io
+from ._util.fixture_cache import link_fixture
+from ._util.measurement_set import cached_synthetic_ms, synthetic_ms_bytes
+from ._util.memory import run_under_memory_cap
+from ._util.processing_set import list_partitions, replicate_processing_set
+from ._util.scratch import remove_scratch_dir, scratch_dir
+
 
 class TestEstimateConversionMemoryAndCores:
     """
@@ -56,8 +68,7 @@ class TestConvertMsv2ToProcessingSet:
 
     version = "xradio 1.0.2"
 
-    out_path = "test_convert_msv2_to_proc_set_without_ps_zarr_ending"
-    out_path_with_ending = out_path + ".ps.zarr"
+    out_name = "test_convert_msv2_to_proc_set_without_ps_zarr_ending"
 
     def setup_cache(self):
         # Generate minimal measurement set once per environment/commit
@@ -71,12 +82,16 @@ class TestConvertMsv2ToProcessingSet:
         )
         return ms_path
 
+    def setup(self, ms_path):
+        # a per-process scratch directory, so that concurrent runs do not
+        # clobber each other's output
+        self.tmp_dir = scratch_dir("convert")
+        self.out_path = os.path.join(self.tmp_dir, self.out_name)
+        self.out_path_with_ending = self.out_path + ".ps.zarr"
+
     def teardown(self, ms_path):
         """Clean up the output file after each benchmark"""
-        try:
-            shutil.rmtree(self.out_path_with_ending)
-        except FileNotFoundError:
-            pass
+        remove_scratch_dir(self.tmp_dir)
 
     def time_convert_with_field_partition(self, ms_path):
         """Benchmark MS conversion with FIELD_ID partition and write mode"""
@@ -131,3 +146,351 @@ class TestConvertMsv2ToProcessingSet:
         check_datatree(ps_xdt)
         # Open with xradio function
         open_xdt = open_processing_set(self.out_path_with_ending, scan_intents="faulty")
+
+
+class TestConvertMsv2ToProcessingSetIO:
+    """
+    Zarr I/O counts of the TestConvertMsv2ToProcessingSet workflows.
+
+    Reports, per metric in IO_METRICS, the number of zarr store calls made
+    by the conversion and by the full convert, validate and open workflow,
+    on the same MS as TestConvertMsv2ToProcessingSet, and the bytes read and
+    written (IO_BYTES_METRICS) in the track_*_bytes benchmarks. Every
+    workflow is run once, in setup_cache, and all the metrics are read from
+    its counter.
+    """
+
+    version = "xradio 1.0.2"
+
+    params = IO_METRICS
+    param_names = ["metric"]
+
+    def setup_cache(self):
+        # Generate minimal measurement set once per environment/commit
+        # Use same parameters as ms_minimal_misbehaved fixture
+        ms_path, _ = gen_test_ms(
+            "test_msv2_minimal_required_misbehaved.ms",
+            opt_tables=True,
+            vlbi_tables=False,
+            required_only=True,
+            misbehave=True,
+        )
+        tmp_dir = scratch_dir()
+        out_path = os.path.join(tmp_dir, "test_convert_io.ps.zarr")
+
+        def convert():
+            convert_msv2_to_processing_set(
+                ms_path,
+                out_file=out_path,
+                partition_scheme=["FIELD_ID"],
+                persistence_mode="w",
+                parallel_mode="bogus_mode",
+            )
+
+        def full_workflow():
+            convert()
+            ps_xdt = xr.open_datatree(out_path, engine="zarr")
+            check_datatree(ps_xdt)
+            open_processing_set(out_path, scan_intents="faulty")
+
+        try:
+            return {
+                "convert_with_field_partition": count_zarr_io(convert),
+                "full_workflow": count_zarr_io(full_workflow),
+            }
+        finally:
+            remove_scratch_dir(tmp_dir)
+
+    def track_convert_with_field_partition(self, counters, metric):
+        """Zarr I/O of MS conversion with FIELD_ID partition"""
+        return getattr(counters["convert_with_field_partition"], metric)
+
+    track_convert_with_field_partition.unit = "count"
+
+    def track_convert_with_field_partition_bytes(self, counters, metric):
+        """Bytes transferred by MS conversion with FIELD_ID partition"""
+        return self.track_convert_with_field_partition(counters, metric)
+
+    track_convert_with_field_partition_bytes.params = IO_BYTES_METRICS
+    track_convert_with_field_partition_bytes.unit = "bytes"
+
+    def track_full_workflow(self, counters, metric):
+        """Zarr I/O of the full workflow: convert, open, validate and open with xradio"""
+        return getattr(counters["full_workflow"], metric)
+
+    track_full_workflow.unit = "count"
+
+    def track_full_workflow_bytes(self, counters, metric):
+        """Bytes transferred by the full workflow: convert, open, validate and open with xradio"""
+        return self.track_full_workflow(counters, metric)
+
+    track_full_workflow_bytes.params = IO_BYTES_METRICS
+    track_full_workflow_bytes.unit = "bytes"
+
+
+# Converts in a fresh interpreter, so that the RSS measured is that of the
+# conversion alone (plus imports), not of the asv benchmark process
+_CONVERT_SCRIPT = """
+import json
+import sys
+
+from xradio.measurement_set import convert_msv2_to_processing_set
+
+convert_msv2_to_processing_set(**json.loads(sys.argv[1]))
+"""
+
+
+class TestConvertMsv2ToProcessingSetBoundedMemory:
+    """
+    Conversion of an MSv2 several times larger than a memory cap.
+
+    Whether convert_msv2_to_processing_set streams the main table or
+    materializes whole partitions only shows on inputs larger than the
+    available memory. A synthetic MS of MS_SIZE_FACTOR times the cap (each
+    of its two partitions twice the cap) is converted for each
+    main_chunksize in a subprocess whose RSS is capped by a watchdog (see
+    run_under_memory_cap); the wall time, the peak RSS and whether it
+    completed under the cap are reported.
+
+    The cap defaults to 512 MiB and can be set with the
+    BENCHVIPER_CONVERSION_MEMORY_CAP_MB environment variable.
+    """
+
+    version = "xradio 1.0.2"
+    timeout = 3600
+
+    params = [None, 0.01, 0.1]
+    param_names = ["main_chunksize"]
+
+    MS_SIZE_FACTOR = 4
+
+    def setup_cache(self):
+        # the conversions are run here, once per main_chunksize, as every
+        # conversion of the large MS is a single, long measurement reported
+        # by three track_ benchmarks
+        cap_bytes = (
+            int(os.environ.get("BENCHVIPER_CONVERSION_MEMORY_CAP_MB", 512)) * 1024**2
+        )
+        # 1 SPW x 2 polarization setups: two partitions of twice the cap each
+        n_spw, n_chan, n_antennas = 1, 256, 5
+        n_times = math.ceil(
+            self.MS_SIZE_FACTOR
+            * cap_bytes
+            / synthetic_ms_bytes(1, n_spw=n_spw, n_chan=n_chan, n_antennas=n_antennas)
+        )
+        # the converting subprocesses need absolute paths
+        ms_path = os.path.abspath(
+            link_fixture(
+                cached_synthetic_ms(
+                    "test_msv2_bounded_memory.ms",
+                    n_times,
+                    n_spw=n_spw,
+                    n_chan=n_chan,
+                    n_antennas=n_antennas,
+                ),
+                "test_msv2_bounded_memory.ms",
+            )
+        )
+        tmp_dir = scratch_dir("bounded-memory")
+        try:
+            results = {}
+            for main_chunksize in self.params:
+                out_file = os.path.join(tmp_dir, "test_bounded_memory.ps.zarr")
+                kwargs = dict(
+                    in_file=ms_path,
+                    out_file=out_file,
+                    partition_scheme=[],
+                    main_chunksize=main_chunksize,
+                    persistence_mode="w",
+                    parallel_mode="none",
+                )
+                results[main_chunksize] = run_under_memory_cap(
+                    [sys.executable, "-c", _CONVERT_SCRIPT, json.dumps(kwargs)],
+                    cap_bytes,
+                )
+                shutil.rmtree(out_file, ignore_errors=True)
+        finally:
+            remove_scratch_dir(tmp_dir)
+        return results
+
+    setup_cache.timeout = 3600
+
+    def track_wall_time(self, results, main_chunksize):
+        """Wall time of the conversion, up to the watchdog kill if over the cap"""
+        return results[main_chunksize]["wall_time"]
+
+    track_wall_time.unit = "seconds"
+
+    def track_peak_rss(self, results, main_chunksize):
+        """Peak resident memory of the converting process"""
+        return results[main_chunksize]["peak_rss"]
+
+    track_peak_rss.unit = "bytes"
+
+    def track_completed_under_cap(self, results, main_chunksize):
+        """1 if the conversion completed within the memory cap, 0 otherwise"""
+        return int(results[main_chunksize]["completed"])
+
+    track_completed_under_cap.unit = "bool"
+
+
+class TestConvertMsv2PartitionSchemes:
+    """
+    Conversion with and without use_table_iter across partition schemes.
+
+    The synthetic MS has several SPWs, fields, scans and intents, so that
+    every scheme yields many partitions: the MS is always partitioned by
+    DATA_DESC_ID and OBS_MODE (which are not partition_scheme keys), and
+    further by the keys of each scheme. Reports the conversion time, the
+    number of MSv4 partitions written and the conversion time per partition.
+    """
+
+    version = "xradio 1.0.2"
+    number = 1
+    warmup_time = 0
+
+    partition_schemes = {
+        "none": [],
+        "FIELD_ID": ["FIELD_ID"],
+        "FIELD_ID,SCAN_NUMBER": ["FIELD_ID", "SCAN_NUMBER"],
+        "STATE_ID": ["STATE_ID"],
+        "ANTENNA1": ["ANTENNA1"],
+    }
+    params = ([False, True], list(partition_schemes))
+    param_names = ["use_table_iter", "partition_scheme"]
+
+    def setup_cache(self):
+        # 4 SPWs x 2 polarization setups, 8 fields over 16 scans with 2 intents
+        return link_fixture(
+            cached_synthetic_ms(
+                "test_msv2_partition_schemes.ms",
+                n_times=320,
+                n_spw=4,
+                n_chan=16,
+                n_antennas=6,
+                n_fields=8,
+                n_states=2,
+                n_scans=16,
+            ),
+            "test_msv2_partition_schemes.ms",
+        )
+
+    def setup(self, ms_path, use_table_iter, partition_scheme):
+        self.tmp_dir = scratch_dir("partition-schemes")
+        self.out_path = os.path.join(self.tmp_dir, "test_partition_schemes.ps.zarr")
+
+    def teardown(self, ms_path, use_table_iter, partition_scheme):
+        remove_scratch_dir(self.tmp_dir)
+
+    def _convert(self, ms_path, use_table_iter, partition_scheme):
+        convert_msv2_to_processing_set(
+            ms_path,
+            out_file=self.out_path,
+            partition_scheme=self.partition_schemes[partition_scheme],
+            use_table_iter=use_table_iter,
+            persistence_mode="w",
+            parallel_mode="none",
+        )
+
+    def time_convert(self, ms_path, use_table_iter, partition_scheme):
+        """Benchmark MS conversion for the given table reading and partition scheme"""
+        self._convert(ms_path, use_table_iter, partition_scheme)
+
+    def track_partition_count(self, ms_path, use_table_iter, partition_scheme):
+        """Number of MSv4 partitions written by the conversion"""
+        self._convert(ms_path, use_table_iter, partition_scheme)
+        return len(list_partitions(self.out_path))
+
+    track_partition_count.unit = "partitions"
+
+    def track_time_per_partition(self, ms_path, use_table_iter, partition_scheme):
+        """Conversion time divided by the number of MSv4 partitions written"""
+        start = time.perf_counter()
+        self._convert(ms_path, use_table_iter, partition_scheme)
+        elapsed = time.perf_counter() - start
+        return elapsed / len(list_partitions(self.out_path))
+
+    track_time_per_partition.unit = "seconds"
+
+
+class TestIncrementalConversion:
+    """
+    Conversion into an existing processing set, with persistence_mode="a".
+
+    An archive ingests observations incrementally into existing processing
+    sets. A synthetic MS with delta_fields fields (one partition per field
+    and polarization setup) is converted into a copy of a processing set of
+    n_existing partitions:
+
+    - append: its partitions are new to the processing set;
+    - overwrite: its partitions were already converted into the processing
+      set, and are converted again in place.
+
+    A conversion time that grows with n_existing rather than with
+    delta_fields means the cost scales with the existing store rather than
+    with the delta.
+    """
+
+    version = "xradio 1.0.2"
+    timeout = 900
+    number = 1
+    warmup_time = 0
+
+    params = (["append", "overwrite"], [8, 64], [1, 4])
+    param_names = ["mode", "n_existing", "delta_fields"]
+
+    def setup_cache(self):
+        # perform the expensive operations once (per env, per commit), see
+        # https://asv.readthedocs.io/en/stable/writing_benchmarks.html#setup-and-teardown-functions
+        seed = "test_incremental_seed.ps.zarr"
+        convert_msv2_to_processing_set(
+            link_fixture(
+                cached_synthetic_ms(
+                    "test_incremental_existing.ms", 50, n_spw=1, n_chan=64
+                ),
+                "test_incremental_existing.ms",
+            ),
+            out_file=seed,
+            partition_scheme=[],
+            persistence_mode="w",
+            parallel_mode="none",
+        )
+        cache = {"existing": {}, "delta": {}}
+        for n_existing in self.params[1]:
+            cache["existing"][n_existing] = replicate_processing_set(
+                seed, f"test_incremental_existing_{n_existing}.ps.zarr", n_existing
+            )
+        for delta_fields in self.params[2]:
+            ms_name = f"test_incremental_delta_{delta_fields}.ms"
+            cache["delta"][delta_fields] = link_fixture(
+                cached_synthetic_ms(
+                    ms_name, 50, n_spw=1, n_chan=64, n_fields=delta_fields
+                ),
+                ms_name,
+            )
+        return cache
+
+    setup_cache.timeout = 1800
+
+    def setup(self, cache, mode, n_existing, delta_fields):
+        self.tmp_dir = scratch_dir("incremental")
+        self.out_path = os.path.join(self.tmp_dir, "test_incremental.ps.zarr")
+        shutil.copytree(cache["existing"][n_existing], self.out_path)
+        if mode == "overwrite":
+            self._convert(cache, delta_fields)
+
+    def teardown(self, cache, mode, n_existing, delta_fields):
+        remove_scratch_dir(self.tmp_dir)
+
+    def _convert(self, cache, delta_fields):
+        convert_msv2_to_processing_set(
+            cache["delta"][delta_fields],
+            out_file=self.out_path,
+            partition_scheme=["FIELD_ID"],
+            persistence_mode="a",
+            parallel_mode="none",
+        )
+
+    def time_convert_into_existing(self, cache, mode, n_existing, delta_fields):
+        """Benchmark converting the delta MS into the existing processing set"""
+        self._convert(cache, delta_fields)
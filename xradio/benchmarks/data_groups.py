@@ -0,0 +1,133 @@
+import numpy as np
+import xarray as xr
+
+from xradio.testing.measurement_set.msv2_io import (
+    gen_minimal_ms,
+    build_minimal_msv4_xdt,
+)
+
+from .image_xds import _make_valid_image_dataset
+
+
+def _make_image_with_data_groups(n_groups):
+    """Create a valid image dataset carrying ``n_groups`` data groups.
+
+    Every group after ``base`` gets its own residual and model variables, as
+    produced by successive major cycles of an imaging run, so both the number
+    of groups and the number of data variables grow with ``n_groups``.
+    """
+    xds = _make_valid_image_dataset()
+    dims = ("time", "frequency", "polarization", "l", "m")
+    shape = tuple(xds.sizes[dim] for dim in dims)
+    xds["SKY"] = xr.DataArray(np.zeros(shape, dtype=np.float32), dims=dims)
+    xds["FLAG_SKY"] = xr.DataArray(np.zeros(shape, dtype=bool), dims=dims)
+    data_groups = dict(xds.attrs["data_groups"])
+    for i in range(1, n_groups):
+        residual, model = f"RESIDUAL_{i}", f"MODEL_{i}"
+        xds[residual] = xr.DataArray(np.zeros(shape, dtype=np.float32), dims=dims)
+        xds[model] = xr.DataArray(np.zeros(shape, dtype=np.float32), dims=dims)
+        data_groups[f"cycle_{i}"] = {
+            "residual": residual,
+            "model": model,
+            "flag": "FLAG_SKY",
+            "description": f"major cycle {i}",
+            "date": "2000-01-01T00:00:00.000",
+        }
+    xds.attrs["data_groups"] = data_groups
+    return xds
+
+
+def _make_msv4_with_data_groups(msv4_xdt, n_groups):
+    """Return a copy of an MSv4 node carrying ``n_groups`` data groups.
+
+    Each extra group copies the ``base`` group with its own correlated data
+    and weight variables, so both the number of groups and the number of data
+    variables grow with ``n_groups``.
+    """
+    xdt = msv4_xdt.copy()
+    base = xdt.attrs["data_groups"]["base"]
+    data_groups = dict(xdt.attrs["data_groups"])
+    for i in range(1, n_groups):
+        group = dict(base)
+        group["correlated_data"] = f"{base['correlated_data']}_{i}"
+        group["weight"] = f"{base['weight']}_{i}"
+        xdt[group["correlated_data"]] = xdt[base["correlated_data"]].copy()
+        xdt[group["weight"]] = xdt[base["weight"]].copy()
+        group["description"] = f"data group {i}"
+        data_groups[f"group_{i}"] = group
+    xdt.attrs["data_groups"] = data_groups
+    return xdt
+
+
+def _last_data_group_name(data_groups):
+    # Select the group added last, the worst case for a linear scan
+    return list(data_groups)[-1]
+
+
+class TestImageManyDataGroups:
+    """
+    Benchmarks for ImageXds data group handling as the number of data groups grows.
+
+    time_sel_with_data_group_name_kwarg and time_add_data_group in
+    TestImageXdsAccessor use one or two data groups. Imaging products carry
+    dozens (per major cycle residuals and models), so these benchmarks are
+    parametrized on the number of data groups to catch linear scans over all
+    groups or variables.
+    """
+
+    version = "xradio 1.0.2"
+
+    params = [1, 10, 50, 200]
+    param_names = ["n_data_groups"]
+
+    def setup(self, n_data_groups):
+        self.xds = _make_image_with_data_groups(n_data_groups)
+        self.data_group_name = _last_data_group_name(self.xds.attrs["data_groups"])
+
+    def time_sel_with_data_group_name(self, n_data_groups):
+        """Benchmark xr_img.sel(data_group_name=...) selecting the last data group."""
+        self.xds.xr_img.sel(data_group_name=self.data_group_name)
+
+    def time_add_data_group(self, n_data_groups):
+        """Benchmark xr_img.add_data_group on an image with many data groups."""
+        self.xds.xr_img.add_data_group("new_group", {"sky": "SKY_NEW"})
+
+
+class TestMeasurementSetManyDataGroups:
+    """
+    Benchmarks for MeasurementSetXdt data group handling as the number of data groups grows.
+
+    Uses the same minimal MSv4 as TestMeasurementSetXdtWithData, extended with
+    extra data groups (each with its own correlated data and weight variables)
+    to catch linear scans over all groups or variables.
+    """
+
+    version = "xradio 1.0.2"
+
+    params = [1, 10, 50, 200]
+    param_names = ["n_data_groups"]
+
+    def setup_cache(self):
+        ms_path, _ = gen_minimal_ms()
+        msv4_path = build_minimal_msv4_xdt(
+            ms_path,
+            partition_kwargs={
+                "DATA_DESC_ID": [0],
+                "OBS_MODE": ["CAL_ATMOSPHERE#ON_SOURCE"],
+            },
+        )
+        return xr.open_datatree(msv4_path, engine="zarr")
+
+    def setup(self, msv4_xdt, n_data_groups):
+        self.msv4_xdt = _make_msv4_with_data_groups(msv4_xdt, n_data_groups)
+        self.data_group_name = _last_data_group_name(
+            self.msv4_xdt.attrs["data_groups"]
+        )
+
+    def time_sel_with_data_group_name(self, _msv4_xdt, n_data_groups):
+        """Benchmark xr_ms.sel(data_group_name=...) selecting the last data group."""
+        self.msv4_xdt.xr_ms.sel(data_group_name=self.data_group_name)
+
+    def time_add_data_group(self, _msv4_xdt, n_data_groups):
+        """Benchmark xr_ms.add_data_group on an MSv4 with many data groups."""
+        self.msv4_xdt.xr_ms.add_data_group("test_added_data_group_with_defaults")
@@ -19,6 +19,10 @@ from xradio.testing.image import (
     remove_path,
 )
 
+from ._util.image import make_scaled_empty_image
+from ._util.io_counting import IO_BYTES_METRICS, IO_METRICS, count_zarr_io
+from ._util.scratch import remove_scratch_dir, scratch_dir
+
 
 class TestLoadImage:
     """
@@ -146,7 +150,7 @@ class TestWriteImageCasa:
     def setup(self, cache):
         self.xds = cache["xds"]
         self.xds_uv = cache["xds_uv"]
-        self.tmp_dir = tempfile.mkdtemp()
+        self.tmp_dir = scratch_dir()
 
 
     def teardown(self, cache):
@@ -215,7 +219,7 @@ class TestCasaRoundtrip:
         remove_path(cache["imname3"])
 
     def setup(self, cache):
-        self.tmp_dir = tempfile.mkdtemp()
+        self.tmp_dir = scratch_dir()
 
     def teardown(self, cache):
         shutil.rmtree(self.tmp_dir, ignore_errors=True)
@@ -289,23 +293,27 @@ class TestZarrRoundtrip:
         xds = open_image(self._imname, {"frequency": 5})
         xds_with_beam = xds.assign(BEAM_FIT_PARAMS=make_beam_fit_params(xds))
         xds_with_beam["BEAM_FIT_PARAMS"].attrs["units"] = "rad"
-        write_image(xds_with_beam, self._zarr_beam_test, out_format="zarr", overwrite=True)
-        bds = open_image(self._zarr_beam_test)
+        # written to a per-process scratch directory rather than the working
+        # directory, so that concurrent runs do not clobber each other
+        cache_dir = scratch_dir("zarr-roundtrip")
+        zarr_beam_test = os.path.join(cache_dir, self._zarr_beam_test)
+        write_image(xds_with_beam, zarr_beam_test, out_format="zarr", overwrite=True)
+        bds = open_image(zarr_beam_test)
         return {
             "imname": self._imname,
-            "zarr_beam_test": self._zarr_beam_test,
+            "cache_dir": cache_dir,
             "xds": xds,
             "bds": bds,
         }
 
     def teardown_cache(self, cache):
         remove_path(cache["imname"])
-        remove_path(cache["zarr_beam_test"])
+        remove_scratch_dir(cache["cache_dir"])
 
     def setup(self, cache):
         self.xds = cache["xds"]
         self.bds = cache["bds"]
-        self.tmp_dir = tempfile.mkdtemp()
+        self.tmp_dir = scratch_dir()
 
     def teardown(self, cache):
         shutil.rmtree(self.tmp_dir, ignore_errors=True)
@@ -360,7 +368,7 @@ class TestWriteImageZarr:
 
     def setup(self, cache):
         self.xds_uv = cache["xds_uv"]
-        self.tmp_dir = tempfile.mkdtemp()
+        self.tmp_dir = scratch_dir()
 
     def teardown(self, cache):
         shutil.rmtree(self.tmp_dir, ignore_errors=True)
@@ -465,3 +473,103 @@ class TestMakeEmptyImages:
         Corresponds to MAKE_EMPTY_CASES entry name="lmuv_no_coords" in the original parametrized test.
         """
         create_empty_test_image(make_empty_lmuv_image, False)
+
+
+class TestMakeEmptyImagesScaling:
+    """
+    Benchmarks for the make_empty_* image factory functions at production sizes.
+
+    Same factories as TestMakeEmptyImages, parametrized over the l/m (u/v)
+    grid size and the number of frequency channels. The peakmem_ benchmarks
+    record the peak memory of each call next to its time, which shows whether
+    sky coordinate generation is vectorized and whether data variables are
+    allocated eagerly or lazily.
+    """
+
+    version = "xradio 1.0.2"
+    timeout = 600
+
+    params = ([1024, 4096, 16384], [1, 512, 4096])
+    param_names = ["image_size", "n_frequency"]
+
+    def time_make_empty_sky(self, image_size, n_frequency):
+        """Benchmark make_empty_sky_image with sky coordinates."""
+        make_scaled_empty_image(make_empty_sky_image, image_size, n_frequency, True)
+
+    def time_make_empty_sky_no_coords(self, image_size, n_frequency):
+        """Benchmark make_empty_sky_image without sky coordinates."""
+        make_scaled_empty_image(make_empty_sky_image, image_size, n_frequency, False)
+
+    def time_make_empty_aperture(self, image_size, n_frequency):
+        """Benchmark make_empty_aperture_image."""
+        make_scaled_empty_image(make_empty_aperture_image, image_size, n_frequency)
+
+    def time_make_empty_lmuv(self, image_size, n_frequency):
+        """Benchmark make_empty_lmuv_image with sky coordinates."""
+        make_scaled_empty_image(make_empty_lmuv_image, image_size, n_frequency, True)
+
+    def peakmem_make_empty_sky(self, image_size, n_frequency):
+        """Peak memory of make_empty_sky_image with sky coordinates."""
+        make_scaled_empty_image(make_empty_sky_image, image_size, n_frequency, True)
+
+    def peakmem_make_empty_sky_no_coords(self, image_size, n_frequency):
+        """Peak memory of make_empty_sky_image without sky coordinates."""
+        make_scaled_empty_image(make_empty_sky_image, image_size, n_frequency, False)
+
+    def peakmem_make_empty_aperture(self, image_size, n_frequency):
+        """Peak memory of make_empty_aperture_image."""
+        make_scaled_empty_image(make_empty_aperture_image, image_size, n_frequency)
+
+    def peakmem_make_empty_lmuv(self, image_size, n_frequency):
+        """Peak memory of make_empty_lmuv_image with sky coordinates."""
+        make_scaled_empty_image(make_empty_lmuv_image, image_size, n_frequency, True)
+
+
+class TestZarrRoundtripIO:
+    """
+    Zarr I/O counts of the TestZarrRoundtrip workflow.
+
+    Reports, per metric in IO_METRICS, the number of zarr store calls made
+    by write_image (zarr) followed by open_image (zarr) on the same
+    CASA-derived dataset as TestZarrRoundtrip, and the bytes read and written
+    (IO_BYTES_METRICS) in track_zarr_roundtrip_bytes. The roundtrip is run
+    once, in setup_cache, and all the metrics are read from its counter.
+    """
+
+    version = "xradio 1.0.2"
+
+    params = IO_METRICS
+    param_names = ["metric"]
+
+    _imname = "casa_test_image.im"
+
+    def setup_cache(self):
+        # perform the expensive operations once (per env, per commit), see
+        # https://asv.readthedocs.io/en/stable/writing_benchmarks.html#setup-and-teardown-functions
+        download_image(self._imname)
+        xds = open_image(self._imname, {"frequency": 5})
+        tmp_dir = scratch_dir()
+        zarr_out = os.path.join(tmp_dir, "out.zarr")
+
+        def roundtrip():
+            write_image(xds, zarr_out, out_format="zarr")
+            open_image(zarr_out)
+
+        try:
+            return count_zarr_io(roundtrip)
+        finally:
+            remove_scratch_dir(tmp_dir)
+            remove_path(self._imname)
+
+    def track_zarr_roundtrip(self, counter, metric):
+        """Zarr I/O of write_image (zarr) + open_image (zarr)"""
+        return getattr(counter, metric)
+
+    track_zarr_roundtrip.unit = "count"
+
+    def track_zarr_roundtrip_bytes(self, counter, metric):
+        """Bytes transferred by write_image (zarr) + open_image (zarr)"""
+        return self.track_zarr_roundtrip(counter, metric)
+
+    track_zarr_roundtrip_bytes.params = IO_BYTES_METRICS
+    track_zarr_roundtrip_bytes.unit = "bytes"
@@ -1,19 +1,32 @@
+import dask.array
 import numpy as np
 import xarray as xr
 
 from xradio.image import make_empty_sky_image
 from xradio.testing.image import create_empty_test_image
 
+from ._util.image import make_scaled_empty_image
+from ._util.memory import traced_peak_bytes
 
-def _make_valid_image_dataset():
+
+def _make_valid_image_dataset(image_size=None, n_frequency=None):
     """Create a minimal Dataset that is valid for the ImageXds accessor.
 
     Built with :func:`~xradio.testing.image.create_empty_test_image`
     (``make_empty_sky_image`` factory, sky coordinates enabled) and promoted
     to an ``image_dataset`` node with a minimal ``data_groups`` mapping so
     that ImageXds methods accept it as an image node.
+
+    When ``image_size`` and ``n_frequency`` are given, the same image is built
+    with an ``image_size`` x ``image_size`` l/m grid and ``n_frequency``
+    channels instead of the default test image dimensions.
     """
-    xds = create_empty_test_image(make_empty_sky_image, do_sky_coords=True)
+    if image_size is None:
+        xds = create_empty_test_image(make_empty_sky_image, do_sky_coords=True)
+    else:
+        xds = make_scaled_empty_image(
+            make_empty_sky_image, image_size, n_frequency, do_sky_coords=True
+        )
     xds.attrs["type"] = "image_dataset"
     xds.attrs["data_groups"] = {
         "base": {
@@ -130,3 +143,76 @@ class TestImageXdsAccessor:
         Corresponds to pytest.param id="indexers_dict" in the original parametrized test.
         """
         self.xds_multi_group.xr_img.sel(indexers={"data_group_name": "base"})
+
+
+class TestImageXdsAccessorScaling:
+    """
+    Benchmarks for ImageXds accessor methods at production image sizes.
+
+    Same accessor calls as TestImageXdsAccessor, but on images with up to
+    16k x 16k l/m grids and thousands of frequency channels. Data variables
+    are lazy dask arrays so that only the accessor work is measured, and each
+    accessor also has a track_ benchmark reporting the bytes it allocates,
+    which exposes O(N^2) coordinate work or hidden copies of the dataset.
+    """
+
+    version = "xradio 1.0.2"
+    # large images take a while to build in setup
+    timeout = 600
+
+    params = ([1024, 4096, 16384], [1, 512, 4096])
+    param_names = ["image_size", "n_frequency"]
+
+    def setup(self, image_size, n_frequency):
+        xds = _make_valid_image_dataset(image_size, n_frequency)
+        dims = ("time", "frequency", "polarization", "l", "m")
+        shape = tuple(xds.sizes[dim] for dim in dims)
+        chunks = (1, 1, 1, image_size, image_size)
+        xds["SKY"] = xr.DataArray(
+            dask.array.zeros(shape, dtype=np.float32, chunks=chunks), dims=dims
+        )
+        xds["FLAG_SKY"] = xr.DataArray(
+            dask.array.zeros(shape, dtype=bool, chunks=chunks), dims=dims
+        )
+        self.xds = xds
+        self.xds_with_uv = xds.xr_img.add_uv_coordinates()
+
+    def time_add_uv_coordinates(self, image_size, n_frequency):
+        """Benchmark add_uv_coordinates on a large image."""
+        self.xds.xr_img.add_uv_coordinates()
+
+    def time_get_uv_in_lambda(self, image_size, n_frequency):
+        """Benchmark get_uv_in_lambda on a large image."""
+        self.xds_with_uv.xr_img.get_uv_in_lambda(1.412e9)
+
+    def time_get_reference_pixel_indices(self, image_size, n_frequency):
+        """Benchmark get_reference_pixel_indices on a large image."""
+        self.xds.xr_img.get_reference_pixel_indices()
+
+    def time_sel_with_data_group_name(self, image_size, n_frequency):
+        """Benchmark sel(data_group_name=...) on a large image."""
+        self.xds.xr_img.sel(data_group_name="base")
+
+    def track_add_uv_coordinates_allocated(self, image_size, n_frequency):
+        """Bytes allocated by add_uv_coordinates on a large image."""
+        return traced_peak_bytes(self.xds.xr_img.add_uv_coordinates)
+
+    track_add_uv_coordinates_allocated.unit = "bytes"
+
+    def track_get_uv_in_lambda_allocated(self, image_size, n_frequency):
+        """Bytes allocated by get_uv_in_lambda on a large image."""
+        return traced_peak_bytes(self.xds_with_uv.xr_img.get_uv_in_lambda, 1.412e9)
+
+    track_get_uv_in_lambda_allocated.unit = "bytes"
+
+    def track_get_reference_pixel_indices_allocated(self, image_size, n_frequency):
+        """Bytes allocated by get_reference_pixel_indices on a large image."""
+        return traced_peak_bytes(self.xds.xr_img.get_reference_pixel_indices)
+
+    track_get_reference_pixel_indices_allocated.unit = "bytes"
+
+    def track_sel_with_data_group_name_allocated(self, image_size, n_frequency):
+        """Bytes allocated by sel(data_group_name=...) on a large image."""
+        return traced_peak_bytes(self.xds.xr_img.sel, data_group_name="base")
+
+    track_sel_with_data_group_name_allocated.unit = "bytes"
@@ -0,0 +1,97 @@
+import os
+import subprocess
+import sys
+
+from xradio.measurement_set import convert_msv2_to_processing_set
+from xradio.testing.image import download_image, remove_path
+from xradio.testing.measurement_set.msv2_io import gen_minimal_ms
+
+
+def _count_imported_modules(module):
+    """Return the number of modules ``import module`` adds in a fresh interpreter."""
+    code = (
+        "import sys; n = len(sys.modules); "
+        f"import {module}; print(len(sys.modules) - n)"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return int(out.stdout.strip())
+
+
+class TestImportTime:
+    """
+    Benchmarks for the cold import cost of xradio subpackages.
+
+    Short-lived pipeline tasks pay the import cost on every worker start.
+    timeraw_ benchmarks run the import in a fresh interpreter for every sample
+    (see https://asv.readthedocs.io/en/stable/writing_benchmarks.html#raw-timing-benchmarks),
+    and the track_ benchmark records how many modules each import pulls in so
+    that import bloat is trended per commit.
+    """
+
+    version = "xradio 1.0.2"
+
+    params = ["xradio.measurement_set", "xradio.image", "xradio.schema"]
+    param_names = ["module"]
+
+    def timeraw_import(self, module):
+        """Benchmark a cold import of the module in a fresh interpreter."""
+        return f"import {module}"
+
+    def track_imported_module_count(self, module):
+        """Number of modules loaded by a cold import of the module."""
+        return _count_imported_modules(module)
+
+    track_imported_module_count.unit = "modules"
+
+
+class TestFirstCallLatency:
+    """
+    Benchmarks for the first call of xradio entry points in a fresh interpreter.
+
+    The import is done in the (untimed) setup code of each timeraw_ benchmark,
+    so only the first call is timed, including any lazy imports, caches or
+    backend registration it triggers.
+    """
+
+    version = "xradio 1.0.2"
+
+    processing_set = "test_first_call.ps.zarr"
+    _imname = "casa_test_image.im"
+
+    def setup_cache(self):
+        # perform the expensive operations once (per env, per commit), see
+        # https://asv.readthedocs.io/en/stable/writing_benchmarks.html#setup-and-teardown-functions
+        ms_path, _ = gen_minimal_ms()
+        convert_msv2_to_processing_set(
+            ms_path,
+            out_file=self.processing_set,
+            partition_scheme=[],
+            persistence_mode="w",
+            parallel_mode="none",
+        )
+        download_image(self._imname)
+        # the timed code runs in a separate interpreter, pass absolute paths
+        return {
+            "processing_set": os.path.abspath(self.processing_set),
+            "imname": os.path.abspath(self._imname),
+        }
+
+    def teardown_cache(self, cache):
+        remove_path(cache["processing_set"])
+        remove_path(cache["imname"])
+
+    def timeraw_first_open_processing_set(self, cache):
+        """Benchmark the first open_processing_set call after a cold import."""
+        return (
+            f"open_processing_set({cache['processing_set']!r})",
+            "from xradio.measurement_set import open_processing_set",
+        )
+
+    def timeraw_first_open_image(self, cache):
+        """Benchmark the first open_image call after a cold import."""
+        return (
+            f"open_image({cache['imname']!r})",
+            "from xradio.image import open_image",
+        )
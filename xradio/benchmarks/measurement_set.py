@@ -1,16 +1,24 @@
 import shutil
+import numpy as np
 import xarray as xr
 
-from xradio.measurement_set import load_processing_set
+from xradio.measurement_set import load_processing_set, open_processing_set
 from xradio.schema.check import check_datatree
 from xradio.measurement_set.processing_set_xdt import ProcessingSetXdt
 from xradio.testing.measurement_set.msv2_io import (
     gen_minimal_ms,
-    build_processing_set_from_msv2,
     build_minimal_msv4_xdt
 )
-from xradio.testing.measurement_set.io import download_measurement_set
 
+from ._util.fixture_cache import link_fixture
+from ._util.io_counting import IO_BYTES_METRICS, IO_METRICS, count_zarr_io
+from ._util.processing_set import (
+    cached_processing_set_from_msv2,
+    convert_minimal_processing_set,
+    convert_synthetic_processing_set,
+    list_partitions,
+    replicate_processing_set,
+)
 
 
 class TestLoadProcessingSet:
@@ -32,14 +40,10 @@ class TestLoadProcessingSet:
 
         # originally adapted from https://github.com/casangi/xradio/blob/main/tests/unit/measurement_set/conftest.py
 
-        ms_path = download_measurement_set(self.MeasurementSet)
-
-        # Convert MS to processing set
-        ps_path = self.processing_set
-
-        build_processing_set_from_msv2(
-            in_file=ms_path,
-            out_file=self.processing_set,
+        # the download and conversion are shared with the other classes and
+        # commits through the fixture cache, and linked into the asv cache dir
+        ps_path = cached_processing_set_from_msv2(
+            self.MeasurementSet,
             partition_scheme=[],
             persistence_mode="w",
             parallel_mode="none",
@@ -49,6 +53,7 @@ class TestLoadProcessingSet:
             ephemeris_interpolate=True,
             use_table_iter=False,
         )
+        link_fixture(ps_path, self.processing_set)
 
     def time_check_datatree(self):
         """Test that the converted MS to PS complies with the datatree schema checker"""
@@ -134,14 +139,10 @@ class TestProcessingSetXdtWithData:
 
         # originally adapted from https://github.com/casangi/xradio/blob/main/tests/_utils/conftest.py
 
-        ms_path = download_measurement_set(self.MeasurementSet)
-
-        # Convert MS to processing set
-        ps_path = self.processing_set
-
-        build_processing_set_from_msv2(
-            in_file=ms_path,
-            out_file=self.processing_set,
+        # the download and conversion are shared with the other classes and
+        # commits through the fixture cache, and linked into the asv cache dir
+        ps_path = cached_processing_set_from_msv2(
+            self.MeasurementSet,
             partition_scheme=[],
             persistence_mode="w",
             parallel_mode="none",
@@ -151,6 +152,7 @@ class TestProcessingSetXdtWithData:
             ephemeris_interpolate=True,
             use_table_iter=False,
         )
+        link_fixture(ps_path, self.processing_set)
 
         # Load the PS in cache to use in every test case
         return load_processing_set(self.processing_set)
@@ -217,14 +219,10 @@ class TestProcessingSetXdtWithEphemerisData:
 
         # originally adapted from https://github.com/casangi/xradio/blob/main/tests/_utils/conftest.py
 
-        ms_path = download_measurement_set(self.MeasurementSet)
-
-        # Convert MS to processing set
-        ps_path = self.processing_set
-
-        build_processing_set_from_msv2(
-            in_file=ms_path,
-            out_file=self.processing_set,
+        # the download and conversion are shared with the other classes and
+        # commits through the fixture cache, and linked into the asv cache dir
+        ps_path = cached_processing_set_from_msv2(
+            self.MeasurementSet,
             partition_scheme=[],
             persistence_mode="w",
             parallel_mode="none",
@@ -234,6 +232,7 @@ class TestProcessingSetXdtWithEphemerisData:
             ephemeris_interpolate=True,
             use_table_iter=False,
         )
+        link_fixture(ps_path, self.processing_set)
 
         # Load the PS in cache to use in every test case
         return load_processing_set(self.processing_set)
@@ -323,3 +322,285 @@ class TestMeasurementSetXdtWithData:
     def time_sel_polarization(self, _msv4_xdt):
         """Benchmark selecting with polarization"""
         self.ms_xdt.sel(polarization="XX")
+
+
+class TestOpenLoadProcessingSetScaling:
+    """
+    Benchmarks for open_processing_set and load_processing_set on large processing sets.
+
+    time_open_processing_set in TestConvertMsv2ToProcessingSet times the
+    conversion together with the open, and TestLoadProcessingSet uses a
+    4-partition processing set. Here the processing sets are pre-built in
+    setup_cache with many partitions (each with its sub-datasets) so that only
+    the open / load is timed. The track_ benchmarks report the number of zarr
+    metadata reads, which dominates the open latency on network storage.
+    """
+
+    version = "xradio 1.0.2"
+    timeout = 600
+
+    params = [4, 32, 128, 512]
+    param_names = ["n_partitions"]
+
+    seed_processing_set = "test_scaling_seed.ps.zarr"
+    scan_intents = "CAL_ATMOSPHERE#ON_SOURCE"
+
+    def setup_cache(self):
+        # perform the expensive operations once (per env, per commit), see
+        # https://asv.readthedocs.io/en/stable/writing_benchmarks.html#setup-and-teardown-functions
+        seed = convert_minimal_processing_set(self.seed_processing_set)
+        return {
+            n_partitions: replicate_processing_set(
+                seed, f"test_scaling_{n_partitions}.ps.zarr", n_partitions
+            )
+            for n_partitions in self.params
+        }
+
+    def setup(self, ps_paths, n_partitions):
+        self.ps_path = ps_paths[n_partitions]
+
+    def time_open_processing_set(self, ps_paths, n_partitions):
+        """Benchmark open_processing_set without filters"""
+        open_processing_set(self.ps_path)
+
+    def time_open_processing_set_scan_intents(self, ps_paths, n_partitions):
+        """Benchmark open_processing_set filtering on scan intents"""
+        open_processing_set(self.ps_path, scan_intents=self.scan_intents)
+
+    def time_load_sub_datasets_false(self, ps_paths, n_partitions):
+        """Benchmark load_processing_set without sub-datasets"""
+        load_processing_set(self.ps_path, load_sub_datasets=False)
+
+    def time_load_sub_datasets_true(self, ps_paths, n_partitions):
+        """Benchmark load_processing_set with sub-datasets"""
+        load_processing_set(self.ps_path, load_sub_datasets=True)
+
+    def track_open_processing_set_metadata_reads(self, ps_paths, n_partitions):
+        """Number of zarr metadata reads made by open_processing_set"""
+        return count_zarr_io(open_processing_set, self.ps_path).metadata_reads
+
+    track_open_processing_set_metadata_reads.unit = "reads"
+
+    def track_open_processing_set_scan_intents_metadata_reads(
+        self, ps_paths, n_partitions
+    ):
+        """Number of zarr metadata reads made by open_processing_set with scan intents"""
+        return count_zarr_io(
+            open_processing_set, self.ps_path, scan_intents=self.scan_intents
+        ).metadata_reads
+
+    track_open_processing_set_scan_intents_metadata_reads.unit = "reads"
+
+    def track_load_sub_datasets_false_metadata_reads(self, ps_paths, n_partitions):
+        """Number of zarr metadata reads made by load_processing_set without sub-datasets"""
+        return count_zarr_io(
+            load_processing_set, self.ps_path, load_sub_datasets=False
+        ).metadata_reads
+
+    track_load_sub_datasets_false_metadata_reads.unit = "reads"
+
+    def track_load_sub_datasets_true_metadata_reads(self, ps_paths, n_partitions):
+        """Number of zarr metadata reads made by load_processing_set with sub-datasets"""
+        return count_zarr_io(
+            load_processing_set, self.ps_path, load_sub_datasets=True
+        ).metadata_reads
+
+    track_load_sub_datasets_true_metadata_reads.unit = "reads"
+
+
+class TestLoadProcessingSetIO:
+    """
+    Zarr I/O counts of the TestLoadProcessingSet workflows.
+
+    Reports, per metric in IO_METRICS, the number of zarr store calls made
+    by load_processing_set and check_datatree on the same processing set as
+    TestLoadProcessingSet, and the bytes read and written (IO_BYTES_METRICS)
+    in the track_*_bytes benchmarks. These do not depend on machine speed,
+    so more metadata reads, more chunk reads or bigger reads show up as a
+    step in the trend. Every workflow is run once, in setup_cache, and all
+    the metrics are read from its counter.
+    """
+    version = "xradio 1.0.2"
+
+    params = IO_METRICS
+    param_names = ["metric"]
+
+    MeasurementSet = "Antennae_North.cal.lsrk.split.ms"
+    processing_set = "test_processing_set_io.ps.zarr"
+
+    def setup_cache(self):
+        # perform the expensive operations once (per env, per commit), see
+        # https://asv.readthedocs.io/en/stable/writing_benchmarks.html#setup-and-teardown-functions
+        # the download and conversion are shared with the other classes and
+        # commits through the fixture cache, and linked into the asv cache dir
+        ps_path = cached_processing_set_from_msv2(
+            self.MeasurementSet,
+            partition_scheme=[],
+            persistence_mode="w",
+            parallel_mode="none",
+            main_chunksize=0.01,
+            pointing_chunksize=0.00001,
+            pointing_interpolate=True,
+            ephemeris_interpolate=True,
+            use_table_iter=False,
+        )
+        link_fixture(ps_path, self.processing_set)
+
+        def load_and_check():
+            check_datatree(load_processing_set(self.processing_set))
+
+        return {
+            "basic_load": count_zarr_io(load_processing_set, self.processing_set),
+            "sub_datasets_true": count_zarr_io(
+                load_processing_set, self.processing_set, load_sub_datasets=True
+            ),
+            "check_datatree": count_zarr_io(load_and_check),
+        }
+
+    def track_basic_load(self, counters, metric):
+        """Zarr I/O of loading the processing set without parameters"""
+        return getattr(counters["basic_load"], metric)
+
+    track_basic_load.unit = "count"
+
+    def track_basic_load_bytes(self, counters, metric):
+        """Bytes transferred by loading the processing set without parameters"""
+        return self.track_basic_load(counters, metric)
+
+    track_basic_load_bytes.params = IO_BYTES_METRICS
+    track_basic_load_bytes.unit = "bytes"
+
+    def track_sub_datasets_true(self, counters, metric):
+        """Zarr I/O of loading the processing set with sub-datasets"""
+        return getattr(counters["sub_datasets_true"], metric)
+
+    track_sub_datasets_true.unit = "count"
+
+    def track_sub_datasets_true_bytes(self, counters, metric):
+        """Bytes transferred by loading the processing set with sub-datasets"""
+        return self.track_sub_datasets_true(counters, metric)
+
+    track_sub_datasets_true_bytes.params = IO_BYTES_METRICS
+    track_sub_datasets_true_bytes.unit = "bytes"
+
+    def track_check_datatree(self, counters, metric):
+        """Zarr I/O of loading and schema checking the processing set"""
+        return getattr(counters["check_datatree"], metric)
+
+    track_check_datatree.unit = "count"
+
+    def track_check_datatree_bytes(self, counters, metric):
+        """Bytes transferred by loading and schema checking the processing set"""
+        return self.track_check_datatree(counters, metric)
+
+    track_check_datatree_bytes.params = IO_BYTES_METRICS
+    track_check_datatree_bytes.unit = "bytes"
+
+
+class _ProcessingSetAccessorsAtScale:
+    """time_ benchmarks of the combination accessors on ``self.ps_xdt``."""
+
+    version = "xradio 1.0.2"
+    timeout = 600
+    # get_max_dims is memoized on the accessor, which xarray caches on the
+    # tree: every call is made on a fresh tree (see setup)
+    number = 1
+    warmup_time = 0
+
+    def setup(self, ps_paths, size):
+        self.ps_xdt = open_processing_set(ps_paths[size])
+        self.msv4_xdt = self.ps_xdt[list_partitions(ps_paths[size])[0]]
+
+    def time_get_combined_antenna_xds(self, ps_paths, size):
+        """Benchmark getting combined antenna dataset from a processing set"""
+        self.ps_xdt.xr_ps.get_combined_antenna_xds()
+
+    def time_get_combined_field_and_source_xds(self, ps_paths, size):
+        """Benchmark getting combined field and source dataset from a processing set"""
+        self.ps_xdt.xr_ps.get_combined_field_and_source_xds()
+
+    def time_get_max_dims(self, ps_paths, size):
+        """Benchmark getting maximum dimensions from a processing set"""
+        self.ps_xdt.xr_ps.get_max_dims()
+
+    def time_select_short_baselines(self, ps_paths, size):
+        """Benchmark selecting the baselines of a partition shorter than the median uv distance"""
+        uvw = self.msv4_xdt["UVW"]
+        uv_distance = np.hypot(
+            uvw.sel(uvw_label="u"), uvw.sel(uvw_label="v")
+        ).max("time")
+        self.msv4_xdt.ds.isel(
+            baseline_id=uv_distance.values <= np.median(uv_distance.values)
+        )
+
+
+class TestProcessingSetManyAntennas(_ProcessingSetAccessorsAtScale):
+    """
+    Combination accessors and UVW selection at SKA-scale antenna counts.
+
+    TestProcessingSetXdtWithData runs on a processing set with a handful of
+    antennas; arrays of 200 to 512 stations have over 100k baselines. The
+    processing sets are converted from synthetic MSs (see
+    convert_synthetic_processing_set) of n_antennas antennas, 2 SPWs and 2
+    polarization setups (4 partitions), with 2 time steps of every baseline,
+    so that quadratic handling of antennas or baselines shows early.
+    """
+
+    params = [16, 64, 256, 512]
+    param_names = ["n_antennas"]
+
+    def setup_cache(self):
+        # perform the expensive operations once (per env, per commit), see
+        # https://asv.readthedocs.io/en/stable/writing_benchmarks.html#setup-and-teardown-functions
+        return {
+            n_antennas: convert_synthetic_processing_set(
+                f"test_many_antennas_{n_antennas}.ps.zarr",
+                2,
+                n_spw=2,
+                n_chan=4,
+                n_antennas=n_antennas,
+            )
+            for n_antennas in self.params
+        }
+
+    setup_cache.timeout = 1800
+
+
+class TestProcessingSetManyFields(_ProcessingSetAccessorsAtScale):
+    """
+    Combination accessors and UVW selection on mosaics with many pointings.
+
+    The processing sets are converted from synthetic MSs (see
+    convert_synthetic_processing_set) with one scan of one time step per
+    field, for n_fields fields, of 4 antennas, 1 SPW and 2 polarization
+    setups (2 partitions, each with every field along field_name).
+    """
+
+    params = [1, 100, 1000, 4000]
+    param_names = ["n_fields"]
+
+    def setup_cache(self):
+        # perform the expensive operations once (per env, per commit), see
+        # https://asv.readthedocs.io/en/stable/writing_benchmarks.html#setup-and-teardown-functions
+        ps_paths = {
+            n_fields: convert_synthetic_processing_set(
+                f"test_many_fields_{n_fields}.ps.zarr",
+                n_fields,
+                n_spw=1,
+                n_chan=4,
+                n_antennas=4,
+                n_fields=n_fields,
+            )
+            for n_fields in self.params
+        }
+        # ephemeris fields are combined along time, or not at all
+        for n_fields, ps_path in ps_paths.items():
+            field_and_source_xds = open_processing_set(
+                ps_path
+            ).xr_ps.get_combined_field_and_source_xds()
+            assert (
+                field_and_source_xds.sizes.get("field_name") == n_fields
+            ), f"Expected {n_fields} fields along field_name in {ps_path}"
+        return ps_paths
+
+    setup_cache.timeout = 1800
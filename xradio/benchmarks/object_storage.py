@@ -0,0 +1,111 @@
+from xradio.image import open_image, write_image
+from xradio.measurement_set import load_processing_set, open_processing_set
+from xradio.testing.image import download_image, remove_path
+
+from ._util.processing_set import convert_minimal_processing_set
+from ._util.s3 import LocalS3Server
+
+
+class TestObjectStorage:
+    """
+    Benchmarks for reading and writing processing sets and images in object storage.
+
+    A processing set converted from the minimal test MS and a zarr copy of
+    the CASA test image are uploaded to a local S3-compatible
+    stand-in (moto) and accessed through fsspec with "s3://" urls. The
+    latency parameter adds a delay to every request to model WAN round
+    trips, and the track_ benchmarks report the number of HTTP requests each
+    call makes, so request-count-heavy regressions become visible.
+    moto[server] and s3fs are installed by the asv install_command; the
+    benchmarks are skipped in environments without them.
+    """
+
+    version = "xradio 1.0.2"
+    timeout = 600
+    # each write goes to a new key, but keep one setup()/teardown() cycle per
+    # sample as for the other write benchmarks so the bucket stays small
+    number = 1
+    warmup_time = 0
+
+    params = [0, 20, 100]
+    param_names = ["latency_ms"]
+
+    processing_set = "test_object_storage.ps.zarr"
+    _imname = "casa_test_image.im"
+    _zarr_image = "bench_object_storage_image.zarr"
+
+    def setup_cache(self):
+        # perform the expensive operations once (per env, per commit), see
+        # https://asv.readthedocs.io/en/stable/writing_benchmarks.html#setup-and-teardown-functions
+        convert_minimal_processing_set(self.processing_set)
+        download_image(self._imname)
+        xds = open_image(self._imname, {"frequency": 5})
+        write_image(xds, self._zarr_image, out_format="zarr", overwrite=True)
+        return {"processing_set": self.processing_set, "zarr_image": self._zarr_image}
+
+    def teardown_cache(self, cache):
+        remove_path(cache["processing_set"])
+        remove_path(cache["zarr_image"])
+        remove_path(self._imname)
+
+    def setup(self, cache, latency_ms):
+        # asv runs setup_cache and the benchmarks in different processes, so
+        # the server (and its in-memory bucket) is started per benchmark
+        self.server = LocalS3Server().start()
+        self.ps_url = self.server.upload(cache["processing_set"], "ps.zarr")
+        self.image_url = self.server.upload(cache["zarr_image"], "image.zarr")
+        self.xds = open_image(cache["zarr_image"])
+        self.n_writes = 0
+        self.server.latency = latency_ms / 1000
+        self.server.reset_request_count()
+
+    def teardown(self, cache, latency_ms):
+        self.server.stop()
+
+    def _write_url(self):
+        self.n_writes += 1
+        return self.server.url(f"out_{self.n_writes}.zarr")
+
+    def time_open_processing_set(self, cache, latency_ms):
+        """Benchmark open_processing_set from object storage"""
+        open_processing_set(self.ps_url)
+
+    def time_load_processing_set(self, cache, latency_ms):
+        """Benchmark load_processing_set from object storage"""
+        load_processing_set(self.ps_url)
+
+    def time_open_image_zarr(self, cache, latency_ms):
+        """Benchmark open_image on a zarr image in object storage"""
+        open_image(self.image_url)
+
+    def time_write_image_zarr(self, cache, latency_ms):
+        """Benchmark write_image writing a zarr image to object storage"""
+        write_image(self.xds, self._write_url(), out_format="zarr")
+
+    def track_open_processing_set_requests(self, cache, latency_ms):
+        """Number of HTTP requests made by open_processing_set"""
+        open_processing_set(self.ps_url)
+        return self.server.request_count
+
+    track_open_processing_set_requests.unit = "requests"
+
+    def track_load_processing_set_requests(self, cache, latency_ms):
+        """Number of HTTP requests made by load_processing_set"""
+        load_processing_set(self.ps_url)
+        return self.server.request_count
+
+    track_load_processing_set_requests.unit = "requests"
+
+    def track_open_image_zarr_requests(self, cache, latency_ms):
+        """Number of HTTP requests made by open_image on a zarr image"""
+        open_image(self.image_url)
+        return self.server.request_count
+
+    track_open_image_zarr_requests.unit = "requests"
+
+    def track_write_image_zarr_requests(self, cache, latency_ms):
+        """Number of HTTP requests made by write_image to a zarr image"""
+        write_image(self.xds, self._write_url(), out_format="zarr")
+        return self.server.request_count
+
+    track_write_image_zarr_requests.unit = "requests"
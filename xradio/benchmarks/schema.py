@@ -1,4 +1,5 @@
 import dataclasses
+import time
 from typing import Literal, Optional
 import numpy
 import xarray
@@ -28,6 +29,10 @@ from xradio.schema.bases import (
     dict_schema,
 )
 from xradio.schema.export import export_schema_json_file, import_schema_json_file
+from xradio.measurement_set.schema import ObservationInfoDict, TimeCoordArray
+from xradio.testing.measurement_set.msv2_io import build_minimal_msv4_xdt, gen_minimal_ms
+
+from ._util.memory import traced_peak_bytes
 
 Dim1 = Literal["coord"]
 Dim2 = Literal["coord2"]
@@ -523,3 +528,102 @@ class TestSchema:
     def time_schema_import(self):
         # Import the schema file exported once in ``setup_cache``.
         import_schema_json_file("test_dataset_schema.json")
+
+
+class TestSchemaCheckThroughput:
+    """
+    Batch throughput of check_dict and check_array.
+
+    Validates a batch of n_objects small dicts or arrays, as done when
+    ingesting many attribute dicts and arrays, against the toy schemas above
+    (TEST_DICT_SCHEMA, TEST_ARRAY_SCHEMA) and against MSv4 schemas
+    (ObservationInfoDict, TimeCoordArray) with inputs taken from a converted
+    MSv4. Invalid inputs (missing and mistyped attributes) exercise the
+    construction of SchemaIssues. Reports the batch time, the throughput and
+    the memory held per checked object (the object's SchemaIssues included).
+    """
+
+    version = "xradio 1.0.2"
+
+    params = (["dict", "array"], ["toy", "msv4"], ["valid", "invalid"])
+    param_names = ["kind", "schema", "inputs"]
+
+    n_objects = 1000
+
+    def setup_cache(self):
+        # take the MSv4 inputs from a converted minimal MS, so that they are
+        # valid for the schemas of the xradio version under test
+        ms_path, _ = gen_minimal_ms()
+        msv4_path = build_minimal_msv4_xdt(
+            ms_path,
+            partition_kwargs={
+                "DATA_DESC_ID": [0],
+                "OBS_MODE": ["CAL_ATMOSPHERE#ON_SOURCE"],
+            },
+        )
+        msv4_xdt = xarray.open_datatree(msv4_path, engine="zarr")
+        return {
+            "observation_info": dict(msv4_xdt.attrs["observation_info"]),
+            "time": msv4_xdt.time.load(),
+        }
+
+    def setup(self, cache, kind, schema, inputs):
+        valid = inputs == "valid"
+        if kind == "dict":
+            make = self._msv4_dict if schema == "msv4" else self._toy_dict
+            self.check = check_dict
+            self.schema = ObservationInfoDict if schema == "msv4" else TEST_DICT_SCHEMA
+        else:
+            make = self._msv4_array if schema == "msv4" else self._toy_array
+            self.check = check_array
+            self.schema = TimeCoordArray if schema == "msv4" else TEST_ARRAY_SCHEMA
+        self.objects = [make(cache, i, valid) for i in range(self.n_objects)]
+
+    @staticmethod
+    def _toy_dict(cache, i, valid):
+        if valid:
+            return {"attr1": f"str{i}", "attr2": i, "attr3": i}
+        return {"attr1": i, "attr3": f"str{i}"}
+
+    @staticmethod
+    def _msv4_dict(cache, i, valid):
+        dct = dict(cache["observation_info"], project_UID=f"uid://test/{i}")
+        if not valid:
+            del dct["observer"]
+            dct["release_date"] = i
+        return dct
+
+    @staticmethod
+    def _toy_array(cache, i, valid):
+        coords = [("coord", numpy.arange(10, dtype=float))]
+        if valid:
+            attrs = {"attr1": f"str{i}", "attr2": i, "attr3": i}
+            return xarray.DataArray(numpy.zeros(10, dtype=complex), coords, attrs=attrs)
+        return xarray.DataArray(numpy.zeros(10, dtype=int), coords, attrs={"attr2": "x"})
+
+    @staticmethod
+    def _msv4_array(cache, i, valid):
+        array = cache["time"] + i
+        array.attrs = dict(cache["time"].attrs) if valid else {"units": "s"}
+        return array
+
+    def _check_batch(self):
+        return [self.check(obj, self.schema) for obj in self.objects]
+
+    def time_check_batch(self, cache, kind, schema, inputs):
+        """Benchmark checking a batch of n_objects objects"""
+        self._check_batch()
+
+    def track_objects_per_second(self, cache, kind, schema, inputs):
+        """Number of objects checked per second"""
+        start = time.perf_counter()
+        self._check_batch()
+        return self.n_objects / (time.perf_counter() - start)
+
+    track_objects_per_second.unit = "objects/s"
+
+    def track_bytes_per_object(self, cache, kind, schema, inputs):
+        """Peak memory allocated while checking the batch, per object"""
+        return traced_peak_bytes(self._check_batch) / self.n_objects
+
+    track_bytes_per_object.unit = "bytes"
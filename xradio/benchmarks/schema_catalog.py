@@ -0,0 +1,154 @@
+import importlib
+import importlib.util
+import inspect
+import os
+import shutil
+
+from xradio.schema.dataclass import xarray_dataclass_to_dataset_schema
+from xradio.schema.export import export_schema_json_file, import_schema_json_file
+
+from ._util.schema import (
+    dataset_schema_classes,
+    import_schema_module,
+    write_schema_module,
+)
+from ._util.scratch import remove_scratch_dir, scratch_dir
+
+# schema modules of xradio
+CATALOGS = {
+    "measurement_set": "xradio.measurement_set.schema",
+    "image": "xradio.image.schema",
+}
+# class attribute memoizing the derived dataset schema, see
+# xarray_dataclass_to_dataset_schema
+DATASET_SCHEMA_MEMO = "__xradio_dataset_schema"
+# generated schema modules, see generated_schema_source
+GENERATED = {
+    "generated_10": dict(n_coords=8, n_data_vars=10, n_attrs=20, depth=6),
+    "generated_30": dict(n_coords=8, n_data_vars=30, n_attrs=20, depth=6),
+}
+
+
+class TestSchemaCatalog:
+    """
+    Benchmarks for deriving, exporting and importing whole schema catalogs.
+
+    Covers the MSv4 and image schema modules of xradio, and generated
+    modules with many Coordof/Dataof references, nested dict schemas and
+    hundreds of attributes. Schemas are derived by the schema decorators
+    when their module is imported, and memoized on the classes:
+
+    - timeraw_ benchmarks time the cold case in a fresh interpreter, the
+      first import of a copy of the catalog module (deriving every schema)
+      and the first import of its JSON exports;
+    - time_ benchmarks time repeated calls in the same process, the
+      derivation with the memoized dataset schemas cleared first.
+    """
+
+    version = "xradio 1.0.2"
+
+    params = list(CATALOGS) + list(GENERATED)
+    param_names = ["catalog"]
+
+    def setup_cache(self):
+        # perform the expensive operations once (per env, per commit), see
+        # https://asv.readthedocs.io/en/stable/writing_benchmarks.html#setup-and-teardown-functions
+
+        # the timed code of the timeraw_ benchmarks runs in a separate
+        # interpreter, pass absolute paths
+        directory = os.path.abspath("schema_catalog")
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory)
+        cache = {"directory": directory}
+        for catalog in self.params:
+            module_name = f"catalog_{catalog}"
+            if catalog in CATALOGS:
+                try:
+                    original = importlib.import_module(CATALOGS[catalog])
+                except ImportError:
+                    # not in this version of xradio
+                    cache[catalog] = None
+                    continue
+                # a copy under another name, to be imported for the first
+                # time by the cold benchmarks
+                with open(os.path.join(directory, f"{module_name}.py"), "w") as f:
+                    f.write(inspect.getsource(original))
+            else:
+                write_schema_module(directory, module_name, **GENERATED[catalog])
+            module = import_schema_module(directory, module_name)
+            json_files = []
+            for klass in dataset_schema_classes(module):
+                json_file = os.path.join(directory, f"{module_name}.{klass.__name__}.json")
+                export_schema_json_file(klass, json_file)
+                json_files.append(json_file)
+            cache[catalog] = {"module": module_name, "json_files": json_files}
+        return cache
+
+    def teardown_cache(self, cache):
+        shutil.rmtree(cache["directory"], ignore_errors=True)
+
+    def setup(self, cache, catalog):
+        if cache[catalog] is None:
+            raise NotImplementedError(f"{CATALOGS[catalog]} not available")
+        self.classes = dataset_schema_classes(
+            import_schema_module(cache["directory"], cache[catalog]["module"])
+        )
+        self.tmp_dir = scratch_dir("schema-catalog")
+
+    def teardown(self, cache, catalog):
+        remove_scratch_dir(self.tmp_dir)
+
+    def timeraw_define_schemas(self, cache, catalog):
+        """Benchmark the cold derivation of every schema of the catalog, on import."""
+        # the dependencies of the catalog are imported untimed, with the
+        # original module for the xradio catalogs
+        dependencies = ["xradio.schema.bases", "xradio.schema.check"]
+        # not in all versions of xradio
+        if importlib.util.find_spec("xradio.schema.measures") is not None:
+            dependencies.append("xradio.schema.measures")
+        setup = (
+            f"import sys; sys.path.insert(0, {cache['directory']!r}); "
+            f"import {', '.join(dependencies)}"
+        )
+        if catalog in CATALOGS:
+            setup += f"; import {CATALOGS[catalog]}"
+        return f"import {cache[catalog]['module']}", setup
+
+    def time_derive_schemas(self, cache, catalog):
+        """Benchmark the derivation of every dataset schema of the catalog, from its memoized array and dict schemas."""
+        for klass in self.classes:
+            # drop the memoized schema, set again by the derivation
+            delattr(klass, DATASET_SCHEMA_MEMO)
+            xarray_dataclass_to_dataset_schema(klass)
+
+    def time_export_schemas(self, cache, catalog):
+        """Benchmark the JSON export of every schema of the catalog."""
+        for klass in self.classes:
+            export_schema_json_file(
+                klass, os.path.join(self.tmp_dir, f"{klass.__name__}.json")
+            )
+
+    def time_import_schemas(self, cache, catalog):
+        """Benchmark repeated JSON imports of every schema of the catalog."""
+        for json_file in cache[catalog]["json_files"]:
+            import_schema_json_file(json_file)
+
+    def timeraw_import_schemas(self, cache, catalog):
+        """Benchmark the first JSON import of every schema of the catalog in a fresh interpreter."""
+        return (
+            f"for json_file in {cache[catalog]['json_files']!r}: "
+            "import_schema_json_file(json_file)",
+            "from xradio.schema.export import import_schema_json_file",
+        )
+
+    def track_attribute_count(self, cache, catalog):
+        """Number of attributes declared by the dataset schemas of the catalog and their arrays."""
+        count = 0
+        for klass in self.classes:
+            schema = xarray_dataclass_to_dataset_schema(klass)
+            count += len(schema.attributes)
+            for array in schema.coordinates + schema.data_vars:
+                count += len(array.attributes)
+        return count
+
+    track_attribute_count.unit = "attributes"
@@ -0,0 +1,51 @@
+import os
+import time
+
+from ._util.scratch import filesystem_type, remove_scratch_dir, scratch_dir, scratch_root
+
+
+class TestScratchSpace:
+    """
+    Characteristics of the scratch space the write benchmarks write into.
+
+    Write benchmarks (image.TestWriteImageZarr, convert_msv2_to_processing_set,
+    ...) write into per-process directories under BENCHVIPER_SCRATCH_DIR (the
+    system temporary directory by default). These results record which kind
+    of device that was and how fast it was on the run, to tell changes of
+    the I/O target apart from changes in xradio.
+    """
+
+    version = "xradio 1.0.2"
+    number = 1
+    warmup_time = 0
+
+    # 64 MiB written in 4 MiB blocks, synced to the device
+    block_size = 4 * 1024**2
+    n_blocks = 16
+
+    def setup(self):
+        self.block = os.urandom(self.block_size)
+        self.tmp_dir = scratch_dir("scratch-space")
+
+    def teardown(self):
+        remove_scratch_dir(self.tmp_dir)
+
+    def track_on_tmpfs(self):
+        """1 if the scratch space is a memory-backed tmpfs, 0 otherwise"""
+        return int(filesystem_type(scratch_root()) == "tmpfs")
+
+    track_on_tmpfs.unit = "bool"
+
+    def track_write_bandwidth(self):
+        """Sequential write bandwidth of the scratch space, including fsync"""
+        path = os.path.join(self.tmp_dir, "bandwidth.bin")
+        start = time.perf_counter()
+        with open(path, "wb") as f:
+            for _ in range(self.n_blocks):
+                f.write(self.block)
+            f.flush()
+            os.fsync(f.fileno())
+        elapsed = time.perf_counter() - start
+        return self.block_size * self.n_blocks / 1024**2 / elapsed
+
+    track_write_bandwidth.unit = "MiB/s"
@@ -0,0 +1,139 @@
+import os
+import pickle
+
+from xradio.image import make_empty_sky_image, open_image, write_image
+from xradio.measurement_set import load_processing_set, open_processing_set
+
+from ._util.image import add_zero_sky, make_scaled_empty_image
+from ._util.processing_set import (
+    convert_minimal_processing_set,
+    list_partitions,
+    replicate_processing_set,
+)
+from ._util.scratch import remove_scratch_dir, scratch_dir
+
+try:
+    # installed with dask.distributed, which uses it to ship tasks to workers
+    import cloudpickle
+except ImportError:
+    cloudpickle = None
+
+SERIALIZERS = {"pickle": pickle, "cloudpickle": cloudpickle}
+
+
+class _Serialization:
+    """time_/track_ benchmarks of pickling ``self.obj`` with ``self.serializer``."""
+
+    def _setup_serializer(self, serializer):
+        self.serializer = SERIALIZERS[serializer]
+        if self.serializer is None:
+            raise NotImplementedError(f"{serializer} is not installed")
+
+    def _dumps(self):
+        return self.serializer.dumps(self.obj, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def time_dumps(self, *args):
+        """Benchmark serializing the object"""
+        self._dumps()
+
+    def time_loads(self, *args):
+        """Benchmark deserializing the object"""
+        # pickle.loads reads cloudpickle output too
+        pickle.loads(self.pickled)
+
+    def track_pickled_size(self, *args):
+        """Size of the serialized object"""
+        return len(self.pickled)
+
+    track_pickled_size.unit = "bytes"
+
+
+class TestProcessingSetSerialization(_Serialization):
+    """
+    Serialization of processing sets and MSv4 nodes shipped to dask workers.
+
+    Objects passed to dask tasks are pickled (with cloudpickle by
+    dask.distributed) for every task. The pickled size of a lazily opened
+    or loaded processing set should grow with its number of partitions, and
+    that of a single MSv4 partition node should not: a node pickled together
+    with its parent tree, or coordinates and attrs duplicated per partition,
+    show up here.
+    """
+
+    version = "xradio 1.0.2"
+    timeout = 600
+
+    params = (
+        ["open_processing_set", "load_processing_set", "msv4_node"],
+        list(SERIALIZERS),
+        [4, 32, 128],
+    )
+    param_names = ["obj", "serializer", "n_partitions"]
+
+    def setup_cache(self):
+        # perform the expensive operations once (per env, per commit), see
+        # https://asv.readthedocs.io/en/stable/writing_benchmarks.html#setup-and-teardown-functions
+        seed = convert_minimal_processing_set("test_serialization_seed.ps.zarr")
+        return {
+            n_partitions: replicate_processing_set(
+                seed, f"test_serialization_{n_partitions}.ps.zarr", n_partitions
+            )
+            for n_partitions in self.params[2]
+        }
+
+    def setup(self, ps_paths, obj, serializer, n_partitions):
+        self._setup_serializer(serializer)
+        ps_path = ps_paths[n_partitions]
+        if obj == "load_processing_set":
+            self.obj = load_processing_set(ps_path)
+        else:
+            self.obj = open_processing_set(ps_path)
+            if obj == "msv4_node":
+                self.obj = self.obj[list_partitions(ps_path)[0]]
+        self.pickled = self._dumps()
+
+
+class TestImageSerialization(_Serialization):
+    """
+    Serialization of lazily opened images shipped to dask workers.
+
+    The pixel data of an image opened with open_image stays on disk, but its
+    l/m and sky coordinates (image_size x image_size right ascension and
+    declination with sky coordinates) are in memory and pickled with it,
+    for every task the image is passed to.
+    """
+
+    version = "xradio 1.0.2"
+    timeout = 600
+
+    params = (list(SERIALIZERS), [256, 1024, 2048])
+    param_names = ["serializer", "image_size"]
+
+    n_frequency = 4
+
+    def setup_cache(self):
+        # perform the expensive operations once (per env, per commit), see
+        # https://asv.readthedocs.io/en/stable/writing_benchmarks.html#setup-and-teardown-functions
+        cache_dir = scratch_dir("serialization")
+        cache = {"cache_dir": cache_dir}
+        for image_size in self.params[1]:
+            xds = add_zero_sky(
+                make_scaled_empty_image(
+                    make_empty_sky_image, image_size, self.n_frequency, do_sky_coords=True
+                )
+            )
+            cache[image_size] = os.path.join(
+                cache_dir, f"test_serialization_{image_size}.img.zarr"
+            )
+            write_image(xds, cache[image_size], out_format="zarr", overwrite=True)
+        return cache
+
+    setup_cache.timeout = 600
+
+    def teardown_cache(self, cache):
+        remove_scratch_dir(cache["cache_dir"])
+
+    def setup(self, cache, serializer, image_size):
+        self._setup_serializer(serializer)
+        self.obj = open_image(cache[image_size])
+        self.pickled = self._dumps()
@@ -0,0 +1,106 @@
+import os
+import sys
+
+from xradio.image import make_empty_sky_image, write_image
+
+from ._util.image import add_zero_sky, make_scaled_empty_image
+from ._util.processing_set import (
+    convert_minimal_processing_set,
+    replicate_processing_set,
+)
+from ._util.soak import WORKLOADS, run_soak
+from ._util.scratch import remove_scratch_dir, scratch_dir
+
+
+class TestSoak:
+    """
+    Memory and file descriptor growth of repeated open/load/check cycles.
+
+    Long-lived workers call open_image, load_processing_set and
+    check_datatree over and over, and slow growth of their RSS forces
+    restarts. Each call is repeated n_iterations times in a fresh process on
+    synthetic stores (a zarr and a CASA image, a processing set of 8
+    partitions), see run_soak, and the growth per call of the RSS, the open
+    file descriptors and the tracemalloc-traced allocations is reported, so
+    that leaks of casacore table handles or zarr caches show up as
+    regressions.
+
+    The source lines whose allocations grew most are printed to stderr (asv
+    run --show-stderr).
+    """
+
+    version = "xradio 1.0.2"
+    timeout = 3600
+
+    params = list(WORKLOADS)
+    param_names = ["workload"]
+
+    n_iterations = 200
+
+    def setup_cache(self):
+        # perform the expensive operations once (per env, per commit), see
+        # https://asv.readthedocs.io/en/stable/writing_benchmarks.html#setup-and-teardown-functions
+
+        # the soaks are run here, once per workload, as every soak is a single
+        # long measurement reported by several track_ benchmarks
+        tmp_dir = scratch_dir("soak")
+        try:
+            xds = add_zero_sky(
+                make_scaled_empty_image(make_empty_sky_image, 256, 16, do_sky_coords=True)
+            )
+            images = {}
+            for out_format, extension in [("zarr", "img.zarr"), ("casa", "im")]:
+                images[out_format] = os.path.join(tmp_dir, f"soak_image.{extension}")
+                write_image(xds, images[out_format], out_format=out_format, overwrite=True)
+            processing_set = replicate_processing_set(
+                convert_minimal_processing_set(os.path.join(tmp_dir, "soak_seed.ps.zarr")),
+                os.path.join(tmp_dir, "soak.ps.zarr"),
+                8,
+            )
+            stores = {
+                "open_image_zarr": images["zarr"],
+                "open_image_casa": images["casa"],
+                "load_processing_set": processing_set,
+                "check_datatree": processing_set,
+            }
+            results = {}
+            for workload in self.params:
+                results[workload] = run_soak(workload, stores[workload], self.n_iterations)
+                print(f"{workload}: top allocation growth", file=sys.stderr)
+                for line in results[workload]["top_growth"]:
+                    print(f"  {line}", file=sys.stderr)
+        finally:
+            remove_scratch_dir(tmp_dir)
+        return results
+
+    setup_cache.timeout = 3600
+
+    def track_rss_growth_per_call(self, results, workload):
+        """Growth of the RSS per call, slope of a linear fit"""
+        return results[workload]["rss_slope"]
+
+    track_rss_growth_per_call.unit = "bytes"
+
+    def track_rss_growth(self, results, workload):
+        """Growth of the RSS over all the calls"""
+        return results[workload]["rss_growth"]
+
+    track_rss_growth.unit = "bytes"
+
+    def track_open_fds_growth_per_call(self, results, workload):
+        """Growth of the number of open file descriptors per call, slope of a linear fit"""
+        return results[workload]["fd_slope"]
+
+    track_open_fds_growth_per_call.unit = "descriptors"
+
+    def track_open_fds_growth(self, results, workload):
+        """Growth of the number of open file descriptors over all the calls"""
+        return results[workload]["fd_growth"]
+
+    track_open_fds_growth.unit = "descriptors"
+
+    def track_traced_growth_per_call(self, results, workload):
+        """Growth of the allocations traced by tracemalloc per call"""
+        return results[workload]["traced_slope"]
+
+    track_traced_growth_per_call.unit = "bytes"
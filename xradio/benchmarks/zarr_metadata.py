@@ -0,0 +1,134 @@
+import os
+
+import xarray as xr
+
+from xradio.image import make_empty_sky_image, open_image, write_image
+from xradio.measurement_set import load_processing_set, open_processing_set
+
+from ._util.image import add_zero_sky, make_scaled_empty_image
+from ._util.processing_set import (
+    convert_minimal_processing_set,
+    replicate_processing_set,
+    rewrite_zarr_store,
+    set_consolidated_metadata,
+    zarr_format_supported,
+)
+
+ZARR_FORMATS = [2, 3]
+
+
+class TestProcessingSetZarrMetadata:
+    """
+    Opening processing sets with and without consolidated metadata, in zarr v2 and v3 format.
+
+    The open latency of processing sets with many partitions is dominated by
+    reading the zarr metadata of their groups and arrays, one object per
+    group and array without consolidated metadata, and a single object at
+    the root with. The same processing sets (copies of the partition of a
+    minimal MS, see replicate_processing_set) are written in each zarr
+    format, with and without consolidated metadata, and opened with
+    open_processing_set, load_processing_set and xr.open_datatree.
+    """
+
+    version = "xradio 1.0.2"
+    timeout = 900
+
+    params = (ZARR_FORMATS, [True, False], [4, 32, 128])
+    param_names = ["zarr_format", "consolidated", "n_partitions"]
+
+    def setup_cache(self):
+        # perform the expensive operations once (per env, per commit), see
+        # https://asv.readthedocs.io/en/stable/writing_benchmarks.html#setup-and-teardown-functions
+        seed = convert_minimal_processing_set("test_zarr_metadata_seed.ps.zarr")
+        ps_paths = {}
+        for zarr_format in ZARR_FORMATS:
+            if not zarr_format_supported(zarr_format):
+                continue
+            format_seed = rewrite_zarr_store(
+                seed, f"test_zarr_metadata_seed_v{zarr_format}.ps.zarr", zarr_format
+            )
+            for consolidated in self.params[1]:
+                for n_partitions in self.params[2]:
+                    key = (zarr_format, consolidated, n_partitions)
+                    ps_paths[key] = replicate_processing_set(
+                        format_seed,
+                        "test_zarr_metadata_v{}_{}_{}.ps.zarr".format(
+                            zarr_format,
+                            "consolidated" if consolidated else "unconsolidated",
+                            n_partitions,
+                        ),
+                        n_partitions,
+                        consolidated=consolidated,
+                    )
+        return ps_paths
+
+    setup_cache.timeout = 1800
+
+    def setup(self, ps_paths, zarr_format, consolidated, n_partitions):
+        if not zarr_format_supported(zarr_format):
+            raise NotImplementedError(f"zarr format {zarr_format} needs zarr>=3")
+        self.ps_path = ps_paths[(zarr_format, consolidated, n_partitions)]
+
+    def time_open_processing_set(self, ps_paths, zarr_format, consolidated, n_partitions):
+        """Benchmark open_processing_set"""
+        open_processing_set(self.ps_path)
+
+    def time_load_processing_set(self, ps_paths, zarr_format, consolidated, n_partitions):
+        """Benchmark load_processing_set"""
+        load_processing_set(self.ps_path)
+
+    def time_open_datatree(self, ps_paths, zarr_format, consolidated, n_partitions):
+        """Benchmark xr.open_datatree on the processing set store"""
+        xr.open_datatree(self.ps_path, engine="zarr")
+
+
+class TestImageZarrMetadata:
+    """
+    Opening zarr images with and without consolidated metadata, in zarr v2 and v3 format.
+
+    A sky image with sky coordinates written by write_image is rewritten in
+    each zarr format, with and without consolidated metadata, and opened
+    with open_image.
+    """
+
+    version = "xradio 1.0.2"
+
+    params = (ZARR_FORMATS, [True, False])
+    param_names = ["zarr_format", "consolidated"]
+
+    def setup_cache(self):
+        # perform the expensive operations once (per env, per commit), see
+        # https://asv.readthedocs.io/en/stable/writing_benchmarks.html#setup-and-teardown-functions
+        seed = os.path.abspath("test_zarr_metadata_seed.img.zarr")
+        write_image(
+            add_zero_sky(
+                make_scaled_empty_image(make_empty_sky_image, 256, 16, do_sky_coords=True)
+            ),
+            seed,
+            out_format="zarr",
+            overwrite=True,
+        )
+        images = {}
+        for zarr_format in ZARR_FORMATS:
+            if not zarr_format_supported(zarr_format):
+                continue
+            for consolidated in self.params[1]:
+                image = rewrite_zarr_store(
+                    seed,
+                    "test_zarr_metadata_v{}_{}.img.zarr".format(
+                        zarr_format, "consolidated" if consolidated else "unconsolidated"
+                    ),
+                    zarr_format,
+                )
+                set_consolidated_metadata(image, consolidated)
+                images[(zarr_format, consolidated)] = image
+        return images
+
+    def setup(self, images, zarr_format, consolidated):
+        if not zarr_format_supported(zarr_format):
+            raise NotImplementedError(f"zarr format {zarr_format} needs zarr>=3")
+        self.image = images[(zarr_format, consolidated)]
+
+    def time_open_image(self, images, zarr_format, consolidated):
+        """Benchmark open_image"""
+        open_image(self.image)